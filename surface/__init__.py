@@ -3,18 +3,35 @@
 if False:  # type checking
     from typing import *
 
-__version__ = "0.8.0"
+__version__ = "0.9.0"
 
 import re as _re
-import importlib as _importlib
-from surface._traversal import Traversal, recurse
+from surface._traversal import Traversal, StaticTraversal, recurse
 from surface._compare import Changes, SemVer, RULES
 from surface._base import Kind, API, UNKNOWN
 
 
 def get_api(
-    name, exclude_modules=False, all_filter=False, depth=6
-):  # type: (str, bool, bool, int) -> API.Module
+    name,
+    exclude_modules=False,
+    all_filter=False,
+    depth=6,
+    static=False,
+    boundary=False,
+    time_budget=None,
+    max_children=None,
+    skip_generated=False,
+    user_repr=True,
+    inherited_refs=False,
+    static_attrs=False,
+    type_sample=20,
+    defer_types=False,
+    typing_jobs=1,
+    cache_limits=None,
+    low_memory=False,
+    slow_access=None,
+    skip_paths=None,
+):  # type: (str, bool, bool, int, bool, bool, Optional[float], Optional[int], bool, bool, bool, bool, int, bool, int, Optional[Dict[Optional[str], Tuple[Optional[int], Optional[int]]]], bool, Optional[float], Optional[Iterable[str]]) -> API.Module
     """
         Get a representation of the provided publicly exposed API.
 
@@ -23,16 +40,46 @@ def get_api(
             exclude_modules (bool): Exclude "naked" imports from API.
             all_filter (bool): Filter API based on __all__ attribute when present.
             depth (int): Limit how far to spider out into the modules.
+            static (bool): Read the API from source files, without importing anything.
+            boundary (bool): Refer to objects from other packages, instead of following them.
+            time_budget (float): Seconds to spend on the module, before giving up on the rest.
+            max_children (int): Summarize the members of a module or class beyond this many.
+            skip_generated (bool): Do not look inside modules marked as generated.
+            user_repr (bool): Run __repr__ methods written in python, when describing unknowns.
+            inherited_refs (bool): Refer to inherited class members by the base that defines them.
+            static_attrs (bool): Look up attributes without running properties, descriptors or hooks.
+            type_sample (int): Most items of a container (list, tuple, set, dict) to type it by.
+            defer_types (bool): Resolve function types after walking, grouped by source file.
+            typing_jobs (int): Threads to resolve deferred types with.
+            cache_limits (dict): Entries and bytes to hold in each named cache. Key None for the rest.
+            low_memory (bool): Drop what was cached within each module or class, once walked.
+            slow_access (float): Seconds looking up a child can take, before it is marked slow.
+            skip_paths (Iterable[str]): Dotted paths not to look up. Marked slow instead.
 
         Returns:
             Tuple[API.Module, ...]: Representation of API
     """
-    mod = _importlib.import_module(name)
-    traversal = Traversal(
-        exclude_modules=exclude_modules, all_filter=all_filter, depth=depth
+    traversal = (StaticTraversal if static else Traversal)(
+        exclude_modules=exclude_modules,
+        all_filter=all_filter,
+        depth=depth,
+        boundary=boundary,
+        time_budget=time_budget,
+        max_children=max_children,
+        skip_generated=skip_generated,
+        user_repr=user_repr,
+        inherited_refs=inherited_refs,
+        static_attrs=static_attrs,
+        type_sample=type_sample,
+        defer_types=defer_types,
+        typing_jobs=typing_jobs,
+        cache_limits=cache_limits,
+        low_memory=low_memory,
+        slow_access=slow_access,
+        skip_paths=skip_paths,
     )
-    api = traversal.traverse(mod)
-    return api
+    with traversal:
+        return traversal.traverse(traversal.load(name))
 
 
 def format_api(api, colour=False, indent=""):  # type: (Iterable[Any], bool, str) -> str
@@ -42,37 +89,57 @@ def format_api(api, colour=False, indent=""):  # type: (Iterable[Any], bool, str
     magenta = ("\033[35m{}\033[0m" if colour else "{}").format
     cyan = ("\033[36m{}\033[0m" if colour else "{}").format
     green = ("\033[32m{}\033[0m" if colour else "{}").format
-    for item in api:
-        if isinstance(item, (API.Class, API.Module)):
-            result += indent + "{} {}:\n".format(
-                magenta(item.__class__.__name__.lower()), cyan(item.name)
-            )
-            if item.body:
-                result += format_api(item.body, colour, indent + "    ")
-        elif isinstance(item, API.Func):
-            if item.args:
-                result += indent + "{} {}(\n".format(magenta("def"), cyan(item.name))
-                result += format_api(item.args, colour, indent + "    ")
-                result += indent + "): -> {}\n".format(green(item.returns))
-            else:
+    # Explicit stack, so deep nesting is not bound by the recursion limit.
+    # Each level holds what is left to format, and what closes it once done.
+    stack = [(iter(api), indent, "")]  # type: List[Tuple[Iterator[Any], str, str]]
+    while stack:
+        items, indent, closing = stack[-1]
+        for item in items:
+            if isinstance(item, (API.Class, API.Module)):
+                result += indent + "{} {}:\n".format(
+                    magenta(item.__class__.__name__.lower()), cyan(item.name)
+                )
+                if item.body:
+                    stack.append((iter(item.body), indent + "    ", ""))
+                    break
+            elif isinstance(item, API.Func):
+                if item.args:
+                    result += indent + "{} {}(\n".format(
+                        magenta("def"), cyan(item.name)
+                    )
+                    stack.append(
+                        (
+                            iter(item.args),
+                            indent + "    ",
+                            indent + "): -> {}\n".format(green(item.returns)),
+                        )
+                    )
+                    break
                 result += indent + "{} {}(): -> {}\n".format(
                     magenta("def"), cyan(item.name), green(item.returns)
                 )
-        elif isinstance(item, API.Arg):
-            name = item.name
-            if item.kind & Kind.VARIADIC:
-                name = "*" + name
-                if item.kind & Kind.KEYWORD:
+            elif isinstance(item, API.Arg):
+                name = item.name
+                if item.kind & Kind.VARIADIC:
                     name = "*" + name
-            result += indent + "{}: {}\n".format(name, green(item.type))
-        elif isinstance(item, API.Var):
-            result += indent + "{}: {}\n".format(item.name, green(item.type))
-        elif isinstance(item, API.Unknown):
-            result += indent + "{}? {}: {}\n".format(
-                item.name, yellow(item.type), yellow(item.info)
-            )
+                    if item.kind & Kind.KEYWORD:
+                        name = "*" + name
+                result += indent + "{}: {}\n".format(name, green(item.type))
+            elif isinstance(item, API.Var):
+                result += indent + "{}: {}\n".format(item.name, green(item.type))
+            elif isinstance(item, API.Ref):
+                result += indent + "{} {}: {}\n".format(
+                    magenta("ref"), cyan(item.name), green(item.path)
+                )
+            elif isinstance(item, API.Unknown):
+                result += indent + "{}? {}: {}\n".format(
+                    item.name, yellow(item.type), yellow(item.info)
+                )
+            else:
+                result += indent + str(item) + "\n"
         else:
-            result += indent + str(item) + "\n"
+            stack.pop()
+            result += closing
     return result
 
 
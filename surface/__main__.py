@@ -83,6 +83,110 @@ def main():
     dump_parser.add_argument(
         "--depth", type=int, default=6, help="Limit the spidering to this depth."
     )
+    dump_parser.add_argument(
+        "--boundary",
+        action="store_true",
+        help="Refer to modules, classes and functions from other packages by path, instead of following them.",
+    )
+    dump_parser.add_argument(
+        "--time-budget",
+        type=float,
+        help="Seconds to spend on each module. Anything left unvisited is marked as such.",
+    )
+    dump_parser.add_argument(
+        "--inherited-refs",
+        action="store_true",
+        help="Refer to inherited class members by the base class that defines them, instead of repeating them.",
+    )
+    dump_parser.add_argument(
+        "--type-sample",
+        type=int,
+        default=20,
+        help="Most items of a container (list, tuple, set, dict) to look at when typing it. (default 20)",
+    )
+    dump_parser.add_argument(
+        "--report-slow",
+        type=int,
+        default=0,
+        help="Show this many of the slowest attribute lookups, by dotted path.",
+    )
+    dump_parser.add_argument(
+        "--slow-access",
+        type=float,
+        help="Seconds an attribute lookup can take. Slower lookups are marked as such, rather than followed.",
+    )
+    dump_parser.add_argument(
+        "--slow-skip",
+        help="File of dotted paths (one per line) not to look up. Lookups found too slow with --slow-access are added to it.",
+    )
+    dump_parser.add_argument(
+        "--static-attrs",
+        action="store_true",
+        help="Look up attributes without running properties, descriptors or __getattr__ hooks. Descriptors are typed from their definitions.",
+    )
+    dump_parser.add_argument(
+        "--max-children",
+        type=int,
+        help="Summarize the members of a module or class beyond this many, as a count.",
+    )
+    dump_parser.add_argument(
+        "--skip-generated",
+        action="store_true",
+        help="Do not look inside modules marked as generated (eg: '@generated' or 'DO NOT EDIT' near the top).",
+    )
+    dump_parser.add_argument(
+        "--skip-user-repr",
+        action="store_true",
+        help="Do not run __repr__ methods written in python, when describing unknown values.",
+    )
+    dump_parser.add_argument(
+        "--static",
+        action="store_true",
+        help="Read modules from their source files, without importing them.",
+    )
+    dump_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to scan modules with. (default 1)",
+    )
+    dump_parser.add_argument(
+        "--defer-types",
+        action="store_true",
+        help="Resolve function types after walking each module, a source file at a time.",
+    )
+    dump_parser.add_argument(
+        "--typing-jobs",
+        type=int,
+        default=1,
+        help="Number of threads to resolve deferred types with. More than one implies --defer-types. (default 1)",
+    )
+    dump_parser.add_argument(
+        "--cache-limit",
+        action="append",
+        help=(
+            "Limit in memory caches, as [NAME=]LIMIT. A plain number counts entries, "
+            "with a unit (kb, mb, gb) it counts bytes. Without a name it applies to every cache. "
+            "Repeat for more. (default 500 entries)"
+        ),
+    )
+    dump_parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Drop cached wrappers, types and walks for each module and class once it is walked. Slower, but holds less at once.",
+    )
+    dump_parser.add_argument(
+        "--shared",
+        action="store_true",
+        help="Write repeated classes and modules once. Referring back to them elsewhere.",
+    )
+    dump_parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=".surface_cache",
+        help="Reuse results for modules whose source has not changed. Stored in this directory. Needs --boundary. (default .surface_cache)",
+    )
     dump_parser.set_defaults(func=run_dump)
 
     # -----------------
@@ -159,4 +263,5 @@ def main():
     sys.exit(ret_code)
 
 
-main()
+if __name__ == "__main__":
+    main()
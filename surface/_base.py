@@ -30,6 +30,7 @@ class API(object):
     Class   = _nt("Class",   ("name", "path", "body"))
     Module  = _nt("Module",  ("name", "path", "body"))
     Unknown = _nt("Unknown", ("name", "type", "info"))
+    Ref     = _nt("Ref",     ("name", "path"))
 # fmt: on
 
 Change = _nt("Change", ("level", "type", "info"))
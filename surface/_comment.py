@@ -14,7 +14,7 @@ import tokenize
 import traceback
 import collections
 
-from surface._utils import FuncSig, get_tokens
+from surface._utils import FuncSig, Session, get_tokens
 from surface._base import TYPE_CHARS, UNKNOWN, PY2
 
 if PY2:
@@ -22,6 +22,8 @@ if PY2:
 
 LOG = logging.getLogger(__name__)
 
+FUNCTION_DEFS = (ast.FunctionDef,) + (() if PY2 else (ast.AsyncFunctionDef,))
+
 func_header_reg = re.compile(r"^[ \t]*(def \w+)", re.M)
 type_comment_reg = re.compile(r"# +type: +({})".format(TYPE_CHARS))
 type_comment_sig_reg = re.compile(
@@ -54,32 +56,105 @@ class Mapper(object):
         return cls(tokens, token_map, parsed_ast)
 
 
-class FuncMapper(Mapper):
+class ArgMapper(Mapper):
     @classmethod
-    def parse(
-        cls, source  # type: str
-    ):  # type: (...) -> Optional[FuncMapper]
-        header = func_header_reg.search(source)
-        if not header:
-            return None
-        source = source[header.start(1) :]
-        mapper = super(FuncMapper, cls).parse(source)
-        return mapper
-
-    def get_signature(self):  # type: () -> Optional[Tuple[str, str]]
-        body = self._ast.body[0]
-        # Silly hack to get around ast inconsistencies
-        # Walk the token stream till we hit the first token on the first line
-        # of the body of the function.
-        # Then walk backwards from there till we hit the end of the function.
-        # If we spot a comment between now and then, sweet. Otherwise nothing to do!
+    def parse(cls, source):  # type: (str) -> Optional[ArgMapper]
+        if PY2:  # python 2 has a bug untokenizing some strings.
+            source += "\n"
+        return super(ArgMapper, cls).parse(source)
+
+    def get_params(self):  # type: () -> List[str]
+        node = self._ast.value
+        # Single variable can just return
+        if not isinstance(node, ast.Tuple):
+            return [tokenize.untokenize(self._tokens).decode("utf8").strip()]
+
+        params = []
+        for i in range(len(node.elts) - 1):
+            start_node = node.elts[i]
+            end_node = node.elts[i + 1]
+            start_index = self._token_map[start_node.lineno, start_node.col_offset]
+            end_index = self._token_map[end_node.lineno, end_node.col_offset] - 1
+            params.append(
+                tokenize.untokenize(self._tokens[start_index:end_index]).strip()
+            )
+        params.append(tokenize.untokenize(self._tokens[end_index + 1 :]).strip())
+        return params
+
+
+class CommentIndex(object):
+    """ Type comments of every function in a source file.
+        The source is tokenized and parsed once, however many functions are looked up. """
+
+    _empty = object()
+
+    def __init__(self, source, tree=None):  # type: (str, Optional[ast.AST]) -> None
+        self._tokens = get_tokens(source)
+        self._token_map = {}  # type: Dict[Tuple[int, int], int]
+        self._line_map = {}  # type: Dict[int, int] # First token on each line
         for i, tok in enumerate(self._tokens):
-            if tok[2][0] == body.lineno:
-                break
-        else:
+            self._token_map[tok[2]] = i
+            self._line_map.setdefault(tok[2][0], i)
+        if tree is None and self._tokens:
+            try:
+                tree = ast.parse(source)
+            except SyntaxError:
+                pass
+        self._functions = {}  # type: Dict[int, Any]
+        if tree is not None and self._tokens:
+            for node in ast.walk(tree):
+                if isinstance(node, FUNCTION_DEFS):
+                    self._functions[first_line(node)] = node
+        self._comments = {}  # type: Dict[int, Any]
+
+    @classmethod
+    def from_lines(cls, path, lines):  # type: (str, List[str]) -> CommentIndex
+        """ Index for a file. Reused while its lines (from linecache) are unchanged. """
+        cache = Session.current().get_cache(cls)
+        cached = cache.get(path)
+        if cached is not None and cached[0] is lines:
+            return cached[1]
+        index = cls("".join(lines))
+        cache[path] = (lines, index)
+        return index
+
+    def get(
+        self, lineno, param_names
+    ):  # type: (int, Optional[Sequence[str]]) -> Optional[Tuple[Dict[str, str], str]]
+        """ Types of the function starting on this line (decorators included) """
+        comment = self._comments.get(lineno, self._empty)
+        if comment is self._empty:
+            comment = self._comments[lineno] = self._read(lineno)
+        if comment is None:
+            return None
+        params, return_type = comment
+        if isinstance(params, dict):
+            return dict(params), return_type
+        # Match parameters to function values
+        if param_names is None:
+            return None
+        # reverse args, as a hack to skip "self" without knowing if it's an unbound method
+        return (
+            {name: typ for name, typ in zip(reversed(param_names), reversed(params))},
+            return_type,
+        )
+
+    def _read(
+        self, lineno
+    ):  # type: (int) -> Optional[Tuple[Union[Dict[str, str], List[str]], str]]
+        node = self._functions.get(lineno)
+        if node is None:
+            return None
+        start = self._line_map.get(lineno)
+        body = self._line_map.get(node.body[0].lineno)
+        if start is None or body is None:
             return None
-        for j in range(i, 0, -1):
-            tok = self._tokens[j]
+
+        # Locate function signature type.
+        # Walk backwards from the first token of the body, till we hit the end of the
+        # function header. If we spot a comment between now and then, sweet.
+        for i in range(body, start, -1):
+            tok = self._tokens[i]
             if tok[0] == token.OP and tok[1] == ":":
                 return None
             if tok[0] == tokenize.COMMENT:
@@ -89,70 +164,59 @@ class FuncMapper(Mapper):
         sig_match = type_comment_sig_reg.match(tok[1])
         if not sig_match:
             return None
-        return (sig_match.group(1) or "").strip(), sig_match.group(2).strip()
+        param_comment = (sig_match.group(1) or "").strip()
+        return_type = sig_match.group(2).strip()
+
+        if not param_comment:  # No parameters, nothing more to do.
+            return {}, return_type
+        if param_comment == "...":  # We have external typing
+            # Individual parameters must have typing...
+            return self._read_params(node, body), return_type
+        param_map = ArgMapper.parse(param_comment + "\n")
+        if not param_map:
+            return None
+        return param_map.get_params(), return_type
 
-    def get_params(self):  # type: () -> Dict[str, str]
-        arg_node = self._ast.args
+    def _read_params(self, node, end):  # type: (Any, int) -> Dict[str, str]
+        """ Types from comments beside each argument """
+        arg_node = node.args
         all_args = (
             arg_node.args
-            + ([arg_node.vararg] or [])
+            + [arg_node.vararg]
             + getattr(arg_node, "kwonlyargs", [])
-            + ([arg_node.kwarg] or [])
+            + [arg_node.kwarg]
         )
         arg_tokens = [
-            self._token_map[arg.lineno, arg.col_offset] for arg in all_args if arg
+            self._token_map[arg.lineno, arg.col_offset]
+            for arg in all_args
+            if (getattr(arg, "lineno", None), getattr(arg, "col_offset", None))
+            in self._token_map
         ]
+        arg_tokens.append(end)
         params = {}
-        i = 0
         for i in range(len(arg_tokens) - 1):
             start_index = arg_tokens[i]
-            start_name = self._tokens[start_index][1]
-            end_index = arg_tokens[i + 1]
-            params[start_name] = (
-                self._get_comment_inline(self._tokens[start_index:end_index]) or UNKNOWN
+            params[self._tokens[start_index][1]] = (
+                _get_comment_inline(self._tokens[start_index : arg_tokens[i + 1]])
+                or UNKNOWN
             )
-        start_index = arg_tokens[i + 1]
-        start_name = self._tokens[start_index][1]
-        params[start_name] = (
-            self._get_comment_inline(self._tokens[start_index:]) or UNKNOWN
-        )
         return params
 
-    def _get_comment_inline(self, tokens):  # type: (Any) -> Optional[str]
-        for tok in tokens:
-            if tok[0] == tokenize.NL:
-                return None
-            if tok[0] == tokenize.COMMENT:
-                tok_match = type_comment_reg.match(tok[1])
-                if tok_match:
-                    return tok_match.group(1)
-        return None
 
+def _get_comment_inline(tokens):  # type: (Any) -> Optional[str]
+    for tok in tokens:
+        if tok[0] == tokenize.NL:
+            return None
+        if tok[0] == tokenize.COMMENT:
+            tok_match = type_comment_reg.match(tok[1])
+            if tok_match:
+                return tok_match.group(1)
+    return None
 
-class ArgMapper(Mapper):
-    @classmethod
-    def parse(cls, source):  # type: (str) -> Optional[ArgMapper]
-        if PY2:  # python 2 has a bug untokenizing some strings.
-            source += "\n"
-        return super(ArgMapper, cls).parse(source)
-
-    def get_params(self):  # type: () -> List[str]
-        node = self._ast.value
-        # Single variable can just return
-        if not isinstance(node, ast.Tuple):
-            return [tokenize.untokenize(self._tokens).decode("utf8").strip()]
 
-        params = []
-        for i in range(len(node.elts) - 1):
-            start_node = node.elts[i]
-            end_node = node.elts[i + 1]
-            start_index = self._token_map[start_node.lineno, start_node.col_offset]
-            end_index = self._token_map[end_node.lineno, end_node.col_offset] - 1
-            params.append(
-                tokenize.untokenize(self._tokens[start_index:end_index]).strip()
-            )
-        params.append(tokenize.untokenize(self._tokens[end_index + 1 :]).strip())
-        return params
+def first_line(node):  # type: (Any) -> int
+    """ Line a function starts on, including its decorators """
+    return min([node.lineno] + [dec.lineno for dec in node.decorator_list])
 
 
 def get_comment(func):  # type: (Any) -> Optional[Tuple[Dict[str, str], str]]
@@ -163,43 +227,25 @@ def get_comment(func):  # type: (Any) -> Optional[Tuple[Dict[str, str], str]]
         return None
 
     try:
-        source = inspect.getsource(func)
+        path = inspect.getsourcefile(func)
+        lines, lineno = inspect.findsource(func)
     except (IOError, TypeError) as err:
         LOG.debug(traceback.format_exc())
         return None
-    if not source:
+    if not path or not lines:
         return None
 
-    func_map = FuncMapper.parse(source)
-    if not func_map:
-        return None
+    sig = FuncSig(func)
+    return CommentIndex.from_lines(path, lines).get(
+        lineno + 1, list(sig.parameters.keys()) if sig else None
+    )
 
-    # Locate function signature type
-    sig_parts = func_map.get_signature()
-    if not sig_parts:
-        return None
-    param_comment, return_comment = sig_parts
-    return_type = return_comment
 
-    if not param_comment:  # No parameters, nothing more to do.
-        return {}, return_type
-
-    if param_comment == "...":  # We have external typing
-        # Individual parameters must have typing...
-        params = {name: typ for name, typ in func_map.get_params().items()}
-        return params, return_type
-
-    else:
-        param_map = ArgMapper.parse(param_comment + "\n")
-        if not param_map:
-            return None
-        # Match parameters to function values
-        sig = FuncSig(func)
-        if not sig:
-            return None
-        # reverse args, as a hack to skip "self" without knowing if it's an unbound method
-        param_names = reversed(sig.parameters.keys())
-        param_types = reversed(param_map.get_params())
-
-        params = {name: typ for name, typ in zip(param_names, param_types)}
-        return params, return_type
+def parse_comment(
+    source, param_names
+):  # type: (str, Optional[Sequence[str]]) -> Optional[Tuple[Dict[str, str], str]]
+    """ Read typing comments from the source of a function """
+    header = func_header_reg.search(source)
+    if not header:
+        return None
+    return CommentIndex(source[header.start(1) :]).get(1, param_names)
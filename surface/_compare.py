@@ -32,6 +32,7 @@ SemVer.MAJOR:
   * Renaming keyword-arguments.
   * Adding positional-arguments.
   * Changing types (except where input types become generics).
+  * Changing what a reference points to.
 
 SemVer.MINOR:
   * Adding new variables, functions, classes, modules, optional-keyword-arguments, *args, **kwargs.
@@ -78,8 +79,11 @@ class Changes(object):
             for child in children:
                 old_child = old.get(child)
                 new_child = new.get(child)
-                if old_child == new_child:
-                    continue
+                try:
+                    if old_child == new_child:
+                        continue
+                except RuntimeError:  # Too deep to compare at once. Walk it instead.
+                    pass
                 new_path = "{}.{}".format(path, child) if path else child
                 for check in checks:
                     if check.will_check(old_child, new_child):
@@ -103,6 +107,7 @@ class Changes(object):
             AddRemoveCheck(),
             CannotVerifyCheck(),
             TypeMatchCheck(),
+            RefCheck(),
             TypingCheck(typer),
             ArgKindCheck(),
             ArgAddRemoveCheck(),
@@ -171,6 +176,18 @@ class TypeMatchCheck(Check):
         return [Change(SemVer.MAJOR, "Type Changed", _was(path, type(old), type(new)))]
 
 
+class RefCheck(Check):
+    """ Check references still point to the same place """
+
+    def will_check(self, old, new):
+        return isinstance(old, API.Ref) and isinstance(new, API.Ref)
+
+    def check(self, path, old, new):
+        return [
+            Change(SemVer.MAJOR, "Reference Changed", _was(path, old.path, new.path))
+        ]
+
+
 class TypingCheck(Check):
     """ Check typing gleaned from live data / annotations / comments / docstrings matches """
 
@@ -390,6 +407,8 @@ class TypingChanges(object):
     def __init__(self, old, new):
         self._old_map = self._map_private_to_public(old)
         self._new_map = self._map_private_to_public(new)
+        # The same type strings come up again and again. Parse each once.
+        self._parsed = {}  # type: Dict[str, ModuleAst]
 
     def compare(
         self, old, new, allow_subtype=True
@@ -397,8 +416,8 @@ class TypingChanges(object):
         if old == new:
             return "", ""
 
-        old_mod = ModuleAst.parse(self.type_visitors, old)
-        new_mod = ModuleAst.parse(self.type_visitors, new)
+        old_mod = self._parse(old)
+        new_mod = self._parse(new)
 
         changes = []
         stack = [(old_mod, new_mod)]
@@ -449,6 +468,15 @@ class TypingChanges(object):
             return changes[-1]
         return "", ""
 
+    def _parse(self, type_string):  # type: (str) -> ModuleAst
+        try:
+            return self._parsed[type_string]
+        except KeyError:
+            parsed = self._parsed[type_string] = ModuleAst.parse(
+                self.type_visitors, type_string
+            )
+            return parsed
+
     @staticmethod
     def _handle_ast_type_change(old, new):
         if isinstance(old, UnknownAst):
@@ -468,7 +496,7 @@ class TypingChanges(object):
         mapping = collections.defaultdict(list)
         while stack:
             path, item = stack.pop()
-            if isinstance(item, API.Class):
+            if isinstance(item, (API.Class, API.Ref)):
                 mapping[item.path].append(path)
             if isinstance(item, (API.Class, API.Module)):
                 for child in item.body:
@@ -5,18 +5,36 @@ if False:  # type checking
 
     I = TypeVar("I", bound="Item")
 
+import sys
+import weakref
 import collections
 
 
 class Item(collections.Mapping):
     """ Wrap objects in a consistent traversal interface. """
 
-    __slots__ = ("__item", "__parent", "__visitors", "__children_names")
+    __slots__ = ("__item", "__parent", "__visitors", "__children_names") + (
+        # Python 2 Mapping is weak referenceable already.
+        ()
+        if hasattr(collections.Mapping, "__weakref__")
+        else ("__weakref__",)
+    )
+
+    # Whether is_this_type depends on nothing but the type of the item.
+    # If so, the answer is remembered for the type, rather than asked every time.
+    by_type = False
+
+    # Visitors worth asking, for each type. Per sequence of visitors.
+    _dispatch = {}  # type: Dict[int, Tuple[Sequence[Any], Dict[type, Sequence[Any]]]]
 
     # ------------------------------------------
     # Internals
     # ------------------------------------------
 
+    def __sizeof__(self):  # type: () -> int
+        # The wrapped object is borrowed. Count the wrapper, and its own names.
+        return object.__sizeof__(self) + sys.getsizeof(self.__children_names)
+
     @property
     def item(self):  # type: (Any) -> Any
         """ Access interal object """
@@ -24,8 +42,14 @@ class Item(collections.Mapping):
 
     @property
     def parent(self):  # type: (Any) -> I
-        """ Get previous object """
-        return self.__parent
+        """ Get previous object. None once it is no longer in use elsewhere. """
+        parent = self.__parent
+        return None if parent is None else parent()
+
+    @property
+    def visitors(self):  # type: (Any) -> Sequence[Type[I]]
+        """ Types children are wrapped with """
+        return self.__visitors
 
     # ------------------------------------------
     # Building
@@ -41,18 +65,48 @@ class Item(collections.Mapping):
         cls, visitors, item, parent=None
     ):  # type: (Sequence[Type[I]], Any, Optional[I]) -> I
         """ Create an instance of Item, wrapping the provided object """
-        for visitor in visitors:
-            if visitor.is_this_type(item, parent):
+        for visitor in cls._get_candidates(visitors, item, parent):
+            if visitor.by_type or visitor.is_this_type(item, parent):
                 return visitor(visitors, item, parent)
         raise TypeError("Unhandled item {}".format(item))
 
+    @staticmethod
+    def _get_candidates(
+        visitors, item, parent
+    ):  # type: (Sequence[Type[I]], Any, Optional[I]) -> Sequence[Type[I]]
+        """ Visitors that could wrap this type of item, in order.
+            Those that decide by type alone are settled here once, and left out if they do not match. """
+        dispatch = Item._dispatch.get(id(visitors))
+        if dispatch is None or dispatch[0] is not visitors:
+            if len(Item._dispatch) > 100:
+                Item._dispatch.clear()
+            dispatch = Item._dispatch[id(visitors)] = (visitors, {})
+        types = dispatch[1]
+        item_type = type(item)
+        try:
+            return types[item_type]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable type
+            return visitors
+        candidates = []
+        for visitor in visitors:
+            if not visitor.by_type:
+                candidates.append(visitor)
+            elif visitor.is_this_type(item, parent):
+                candidates.append(visitor)
+                break
+        types[item_type] = tuple(candidates)
+        return types[item_type]
+
     def __new__(
         cls, visitors, item, parent
     ):  # type: (Sequence[Type[I]], Any, Optional[I]) -> Item
         scope = super(Item, cls).__new__(cls)
         scope.__visitors = visitors
         scope.__item = item
-        scope.__parent = parent  # why is this not weak referenceable?
+        # Weak, so children do not keep the whole walk above them alive.
+        scope.__parent = None if parent is None else weakref.ref(parent)
         scope.__children_names = None
         return scope
 
@@ -5,14 +5,16 @@ if False:  # type checking
 
 import sys
 import enum
+import types
 import inspect
+import itertools
 import typing
 import logging
 import traceback
 
 from surface._base import PY2
-from surface._utils import FuncSig, FuncSigArg, Cache
-from surface._type import LiveType, FuncType, Context, AnnotationType, BUILTIN_TYPES
+from surface._utils import FuncSig, FuncSigArg, Session, getattr_static, is_generated
+from surface._type import LiveType, FuncType, Context, AnnotationType, BUILTIN_INDEX
 
 from surface._item import Item
 
@@ -37,18 +39,31 @@ class LiveItem(Item):
     """ Wrap and traverse live objects """
 
     __slots__ = []  # type: ignore
-    _cache = Cache()
+
+    # Look up children without running properties, descriptors or __getattr__ hooks.
+    STATIC_ATTRS = False
 
     @classmethod
     def wrap(cls, visitors, item, parent=None):
-        item_id = id(item)
-        cache_item = cls._cache.get(item_id, None)
-        if cache_item is None:
-            cls._cache[item_id] = cache_item = super(LiveItem, cls).wrap(
+        # Items can depend on their parent. eg: methods drop "self" only within a class.
+        cache = Session.current().get_cache(LiveItem)
+        item_id = (id(item), id(parent))
+        cache_item = cache.get(item_id, None)
+        if (
+            cache_item is None
+            or cache_item.item is not item
+            or cache_item.parent is not parent
+        ):
+            cache[item_id] = cache_item = super(LiveItem, cls).wrap(
                 visitors, item, parent
             )
         return cache_item
 
+    @staticmethod
+    def clear_cache():  # type: () -> None
+        """ Forget wrappers made so far, in this session """
+        Session.current().get_cache(LiveItem).clear()
+
     def __getitem__(self, name):  # type: (str) -> Item
         """ We can get errors while traversing. Keep them. """
         try:
@@ -60,6 +75,14 @@ class LiveItem(Item):
     def name(self):
         return getattr(self.item, "__name__", "")
 
+    def get_path(self):
+        """ Dotted path to where the item was defined """
+        module = getattr(self.item, "__module__", None) or ""
+        name = getattr(self.item, "__qualname__", "") or self.name
+        if module and name:
+            return "{}.{}".format(module, name)
+        return name
+
     def __repr__(self):
         return "<{}: {}>".format(self.__class__.__name__, self.name)
 
@@ -68,6 +91,7 @@ class ModuleItem(LiveItem):
     """ Wrap live module objects """
 
     __slots__ = []  # type: ignore
+    by_type = True
 
     ALL_FILTER = False
 
@@ -79,6 +103,8 @@ class ModuleItem(LiveItem):
         return inspect.ismodule(item)
 
     def get_child(self, attr):
+        if self.STATIC_ATTRS:
+            return getattr_static(self.item, attr)
         return getattr(self.item, attr)
 
     def get_children_names(self):
@@ -102,29 +128,99 @@ class ModuleItem(LiveItem):
     def get_type(self):
         return getattr(self.item, "__name__", "")
 
+    def get_path(self):
+        return self.name
+
+    def is_generated(self):  # type: () -> bool
+        path = getattr(self.item, "__file__", None) or ""
+        if path.endswith((".pyc", ".pyo")):
+            path = path[:-1]
+        if not path.endswith(".py"):
+            return False
+        try:
+            with open(path, "rb") as handle:
+                header = b"".join(itertools.islice(handle, 30))
+        except IOError:
+            return False
+        return is_generated(header.decode("latin-1"))
+
 
 class ClassItem(LiveItem):
     """ Wrap live class objects """
 
     __slots__ = []  # type: ignore
+    by_type = True
 
     magic_methods = tuple("__{}__".format(_m) for _m in ("new", "init", "call"))
 
+    # Descriptors that bind in builtin code, safe to run with STATIC_ATTRS.
+    builtin_binders = (
+        types.FunctionType,
+        staticmethod,
+        classmethod,
+        type(dict.__dict__["fromkeys"]),
+    )
+
     @staticmethod
     def is_this_type(item, parent):
         return inspect.isclass(item)
 
+    @classmethod
+    def get_members(cls, klass):  # type: (Any) -> Dict[str, Any]
+        """ Names available on a class, mapped to the class that defines them.
+            Built once per class, from the table of its base where it can. """
+        cache = Session.current().get_cache(ClassItem)
+        key = id(klass)
+        cached = cache.get(key)
+        if cached is not None and cached[0] is klass:
+            return cached[1]
+        bases = getattr(klass, "__bases__", ())
+        if len(bases) == 1:
+            members = dict(cls.get_members(bases[0]))
+        else:
+            members = {}
+            for base in reversed(inspect.getmro(klass)[1:]):
+                members.update((name, base) for name in getattr(base, "__dict__", {}))
+        members.update((name, klass) for name in getattr(klass, "__dict__", {}))
+        cache[key] = (klass, members)
+        return members
+
+    def get_owner(self, name):  # type: (str) -> Optional[str]
+        """ Path to the base class the member was inherited from, if it was """
+        owner = self.get_members(self.item).get(name)
+        if owner is None or owner is self.item:
+            return None
+        return self.wrap(self.visitors, owner).get_path()
+
     def get_children_names(self):
-        names = [name for name in sorted(dir(self.item)) if not name.startswith("_")]
+        if getattr(type(self.item), "__dir__", None) is getattr(type, "__dir__", None):
+            names = sorted(
+                name for name in self.get_members(self.item) if not name.startswith("_")
+            )
+        else:
+            # Metaclass decides what is visible (eg: Enum)
+            names = [
+                name for name in sorted(dir(self.item)) if not name.startswith("_")
+            ]
         for attr in self.magic_methods:
-            if hasattr(self.item, attr) and FunctionItem.is_this_type(
-                getattr(self.item, attr), self
-            ):
+            try:
+                method = self.get_child(attr)
+            except AttributeError:
+                continue
+            if FunctionItem.is_this_type(method, self):
                 names.append(attr)
         return names
 
     def get_child(self, attr):
-        return getattr(self.item, attr)
+        if not self.STATIC_ATTRS:
+            return getattr(self.item, attr)
+        value = getattr_static(self.item, attr)
+        if type(value) in self.builtin_binders:
+            # Bind as getattr would. Nothing of the packages own is run.
+            if attr in self.get_members(self.item):
+                return value.__get__(None, self.item)
+            return value.__get__(self.item, type(self.item))  # From the metaclass
+        return value
 
     def get_type(self):
         module = getattr(inspect.getmodule(self.item), "__name__", "")
@@ -140,19 +236,24 @@ class VarItem(LiveItem):
     """ Wrap variable. Fallback. """
 
     __slots__ = []  # type: ignore
+    by_type = True
     EMPTY = object()
 
     @staticmethod
     def is_this_type(item, parent):
         return True
 
-    def get_type(self):
-        annotation = getattr(self.parent, "__annotations__", {}).get(
-            self.name, self.EMPTY
+    def get_type(self, name=None):  # type: (Optional[str]) -> str
+        """ Type from the annotation given the name in the parent, else from the value """
+        parent = getattr(self.parent, "item", None)
+        annotation = getattr(parent, "__annotations__", {}).get(
+            name or self.name, self.EMPTY
         )
         if annotation is self.EMPTY:
             return str(LiveType(self.item))
-        context = Context(getattr(inspect.getmodule(self.item), "__dict__", {}))
+        # Annotations are written in (and resolve against) the module holding them
+        module = parent if inspect.ismodule(parent) else inspect.getmodule(parent)
+        context = Context(getattr(module, "__dict__", {}))
         return AnnotationType(annotation, context).type
 
 
@@ -163,10 +264,7 @@ class BuiltinItem(LiveItem):
 
     @staticmethod
     def is_this_type(item, parent):
-        for builtin_type in BUILTIN_TYPES:
-            if item is builtin_type:
-                return True
-        return False
+        return id(item) in BUILTIN_INDEX
 
     def get_type(self):
         return self.item.__name__
@@ -176,6 +274,7 @@ class EnumItem(LiveItem):
     """ Wrap enum. """
 
     __slots__ = []  # type: ignore
+    by_type = True
 
     @staticmethod
     def is_this_type(item, parent):
@@ -193,6 +292,7 @@ class NoneItem(LiveItem):
     """ Wrap None. """
 
     __slots__ = []  # type: ignore
+    by_type = True
 
     @staticmethod
     def is_this_type(item, parent):
@@ -203,6 +303,7 @@ class FunctionItem(LiveItem):
     """ Wrap function / method """
 
     __slots__ = []  # type: ignore
+    by_type = True
 
     @staticmethod
     def is_this_type(item, parent):
@@ -237,14 +338,10 @@ class FunctionItem(LiveItem):
         if not isinstance(self.parent, ClassItem):
             return False
         name = self.name
-        for parent in inspect.getmro(self.parent.item):
-            dct = getattr(parent, "__dict__", {})
-            if name not in dct:
-                continue
-            func = dct[name]
-            if isinstance(func, (staticmethod, classmethod)):
-                return name == "__new__"
-            break
+        owner = self.parent.get_members(self.parent.item).get(name)
+        func = getattr(owner, "__dict__", {}).get(name)
+        if isinstance(func, (staticmethod, classmethod)):
+            return name == "__new__"
         return True
 
 
@@ -252,6 +349,7 @@ class ParameterItem(LiveItem):
     """ Wrap function parameter """
 
     __slots__ = []  # type: ignore
+    by_type = True
 
     @staticmethod
     def is_this_type(item, parent):
@@ -0,0 +1,776 @@
+""" Wrapping source files. Read API without importing anything """
+
+if False:  # type checking
+    from typing import *
+
+import os
+import ast
+import sys
+import typing
+import logging
+import tokenize
+import collections
+
+from surface._base import UNKNOWN, PY2, Kind
+from surface._doc import handle_google
+from surface._comment import CommentIndex, first_line
+from surface._utils import IDCache, is_generated
+from surface._item_static import AstItem
+
+if PY2:
+    import __builtin__ as builtins
+else:
+    import builtins
+
+LOG = logging.getLogger(__name__)
+
+BUILTIN_NAMES = set(
+    name for name, val in builtins.__dict__.items() if isinstance(val, type)
+)
+
+FUNCTION_NODES = (ast.FunctionDef, ast.Lambda) + (
+    () if PY2 else (ast.AsyncFunctionDef,)
+)  # type: Tuple[Any, ...]
+
+# Unresolved import. Could not find the source.
+Unresolved = collections.namedtuple("Unresolved", ("module", "name"))
+
+# Reference to an imported name. Name is None when importing a module.
+Import = collections.namedtuple("Import", ("module", "name"))
+
+# Function parameter
+SourceArg = collections.namedtuple(
+    "SourceArg", ("name", "kind", "annotation", "default", "func")
+)
+
+# Marker for values that are not simple constants
+NOT_LITERAL = object()
+
+_modules = {}  # type: Dict[str, Optional[SourceModule]]
+
+
+def find_source(name):  # type: (str) -> Optional[str]
+    """ Locate the source file of a module, without importing it. """
+    parts = name.split(".")
+    for root in sys.path:
+        base = os.path.join(root, *parts)
+        package = os.path.join(base, "__init__.py")
+        if os.path.isfile(package):
+            return package
+        if os.path.isfile(base + ".py"):
+            return base + ".py"
+    return None
+
+
+def load_source(name):  # type: (str) -> Optional[SourceModule]
+    """ Parse a module from its source. Returns None if it cannot be found. """
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+    path = find_source(name)
+    module = _modules[name] = None  # Guard against import cycles
+    if path:
+        try:
+            if PY2:
+                with open(path, "r") as handle:
+                    source = handle.read()
+            else:
+                with tokenize.open(path) as handle:
+                    source = handle.read()
+            module = SourceModule(name, path, source)
+        except (SyntaxError, UnicodeDecodeError) as err:
+            LOG.warning("Could not parse {}: {}".format(path, err))
+    _modules[name] = module
+    return module
+
+
+class SourceModule(object):
+    """ Parsed module, and the names it binds """
+
+    def __init__(self, name, path, source):  # type: (str, str, str) -> None
+        LOG.debug("Parsing: {}".format(path))
+        self.name = name
+        self.path = path
+        self.lines = source.splitlines(True)
+        self.node = ast.parse(source, path)
+        self.package = (
+            name if os.path.basename(path) == "__init__.py" else name.rpartition(".")[0]
+        )
+        self.bindings = get_bindings(self, self.node.body)
+        self._nodes = {}  # type: Dict[Tuple[int, str], SourceNode]
+        self._members = {}  # type: Dict[int, Dict[str, Tuple[SourceNode, Any]]]
+        self._comments = None  # type: Optional[CommentIndex]
+
+    def __repr__(self):
+        return "<module '{}' from '{}'>".format(self.name, self.path)
+
+    def get_public_names(self):  # type: () -> List[str]
+        """ Names exported with "import *" """
+        all_node = self.bindings.get("__all__")
+        if isinstance(all_node, (ast.List, ast.Tuple)):
+            names = (_literal_value(elt) for elt in all_node.elts)
+            return [name for name in names if name is not NOT_LITERAL]
+        return [name for name in self.bindings if not name.startswith("_")]
+
+    def get_node(self, node, qualname):  # type: (Any, str) -> SourceNode
+        """ Wrap node. The same node always gets the same wrapper. """
+        key = (id(node), qualname)
+        try:
+            return self._nodes[key]
+        except KeyError:
+            self._nodes[key] = wrapped = SourceNode(self, qualname, node)
+            return wrapped
+
+    def get_comment(
+        self, node, param_names
+    ):  # type: (Any, Sequence[str]) -> Optional[Tuple[Dict[str, str], str]]
+        """ Types from the comments of a function """
+        if self._comments is None:
+            self._comments = CommentIndex("".join(self.lines), self.node)
+        return self._comments.get(first_line(node), param_names)
+
+    def get_members(
+        self, snode
+    ):  # type: (SourceNode) -> Dict[str, Tuple[SourceNode, Any]]
+        """ Names available on a class, including those from resolvable bases """
+        key = id(snode)
+        try:
+            return self._members[key]
+        except KeyError:
+            pass
+        self._members[key] = members = collections.OrderedDict()  # guard cycles
+        for base in reversed(snode.node.bases):
+            base_node = resolve(self, base, "")
+            if isinstance(base_node, SourceNode) and isinstance(
+                base_node.node, ast.ClassDef
+            ):
+                members.update(base_node.module.get_members(base_node))
+        for name, value in get_bindings(self, snode.node.body).items():
+            members[name] = (snode, value)
+        return members
+
+
+class SourceNode(collections.namedtuple("SourceNode", ("module", "qualname", "node"))):
+    """ A node, in the context of its module """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        if isinstance(self.node, ast.ClassDef):
+            return "<class '{}.{}'>".format(self.module.name, self.qualname)
+        if isinstance(self.node, FUNCTION_NODES):
+            return "<function {}>".format(self.qualname)
+        lineno = getattr(self.node, "lineno", 0)
+        if not lineno:
+            return UNKNOWN
+        return self.module.lines[lineno - 1].strip()
+
+
+# ------------------------------------------
+# Scopes
+# ------------------------------------------
+
+
+def get_bindings(module, body):  # type: (SourceModule, Sequence[Any]) -> Dict[str, Any]
+    """ Collect names bound in a block of statements, and what they are bound to. """
+    bindings = collections.OrderedDict()  # type: Dict[str, Any]
+    for stmt in body:
+        if isinstance(stmt, (ast.ClassDef,) + FUNCTION_NODES):
+            if not (_is_accessor(stmt) and stmt.name in bindings):
+                bindings[stmt.name] = stmt
+        elif isinstance(stmt, ast.Assign):
+            for target in stmt.targets:
+                _bind_target(bindings, target, stmt.value)
+        elif not PY2 and isinstance(stmt, getattr(ast, "AnnAssign", ())):
+            if isinstance(stmt.target, ast.Name):
+                bindings[stmt.target.id] = stmt
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                if alias.asname:
+                    bindings[alias.asname] = Import(alias.name, None)
+                else:
+                    head = alias.name.split(".", 1)[0]
+                    bindings[head] = Import(head, None)
+        elif isinstance(stmt, ast.ImportFrom):
+            base = _absolute_import(module, stmt.module or "", stmt.level or 0)
+            for alias in stmt.names:
+                if alias.name != "*":
+                    bindings[alias.asname or alias.name] = Import(base, alias.name)
+                    continue
+                star_module = load_source(base)
+                if star_module:
+                    for name in star_module.get_public_names():
+                        bindings[name] = Import(base, name)
+        elif isinstance(stmt, ast.If):
+            if not _is_type_checking(stmt.test):
+                bindings.update(get_bindings(module, stmt.body))
+                bindings.update(get_bindings(module, stmt.orelse))
+        elif isinstance(stmt, ast.With):
+            bindings.update(get_bindings(module, stmt.body))
+        elif hasattr(stmt, "handlers"):  # try / except
+            for handler in stmt.handlers:
+                for name, value in get_bindings(module, handler.body).items():
+                    bindings.setdefault(name, value)
+            bindings.update(get_bindings(module, stmt.body))
+            bindings.update(get_bindings(module, stmt.orelse))
+        elif hasattr(stmt, "finalbody"):  # try / finally
+            bindings.update(get_bindings(module, stmt.body))
+            bindings.update(get_bindings(module, stmt.finalbody))
+    return bindings
+
+
+def _bind_target(bindings, target, value):  # type: (Dict[str, Any], Any, Any) -> None
+    if isinstance(target, ast.Name):
+        bindings[target.id] = value
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        values = (
+            value.elts
+            if isinstance(value, (ast.Tuple, ast.List))
+            and len(value.elts) == len(target.elts)
+            else [None] * len(target.elts)
+        )
+        for sub_target, sub_value in zip(target.elts, values):
+            _bind_target(bindings, sub_target, sub_value)
+
+
+def _absolute_import(module, name, level):  # type: (SourceModule, str, int) -> str
+    if not level:
+        return name
+    parts = module.package.split(".")
+    if level > 1:
+        parts = parts[: 1 - level]
+    if name:
+        parts.append(name)
+    return ".".join(parts)
+
+
+def _is_type_checking(test):  # type: (Any) -> bool
+    """ Blocks not run at runtime. eg: if False, if TYPE_CHECKING """
+    name = get_dotted(test)
+    if name and name.split(".")[-1] == "TYPE_CHECKING":
+        return True
+    return _literal_value(test) is False
+
+
+def get_dotted(node):  # type: (Any) -> str
+    """ Dotted name from a Name / Attribute chain. Empty if not a name. """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return ""
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _literal_value(node):  # type: (Any) -> Any
+    """ Value of a constant node, or NOT_LITERAL. """
+    for attr, node_type in (
+        ("value", "Constant"),
+        ("value", "NameConstant"),
+        ("n", "Num"),
+        ("s", "Str"),
+        ("s", "Bytes"),
+    ):
+        if type(node).__name__ == node_type:
+            return getattr(node, attr)
+    if isinstance(node, ast.Name) and node.id in ("True", "False", "None"):
+        return {"True": True, "False": False, "None": None}[node.id]
+    return NOT_LITERAL
+
+
+# ------------------------------------------
+# Resolving
+# ------------------------------------------
+
+
+def resolve(
+    module, value, qualname, hops=0
+):  # type: (SourceModule, Any, str, int) -> Any
+    """ Follow imports and aliases to the definition of a binding. """
+    if hops > 20:
+        return module.get_node(value, qualname)
+    if isinstance(value, Import):
+        if value.name is None:
+            return load_source(value.module) or Unresolved(value.module, None)
+        target = load_source(value.module)
+        if target and value.name in target.bindings:
+            return resolve(target, target.bindings[value.name], value.name, hops + 1)
+        submodule = "{}.{}".format(value.module, value.name)
+        return load_source(submodule) or Unresolved(value.module, value.name)
+    dotted = get_dotted(value)
+    if dotted:
+        head, _, tail = dotted.partition(".")
+        if head in module.bindings:
+            found = resolve(module, module.bindings[head], head, hops + 1)
+            for attr in tail.split(".") if tail else []:
+                found = _get_attr(found, attr, hops)
+            if found is not None:
+                return found
+    return module.get_node(value, qualname)
+
+
+def _get_attr(item, attr, hops):  # type: (Any, str, int) -> Any
+    if isinstance(item, SourceModule):
+        if attr in item.bindings:
+            return resolve(item, item.bindings[attr], attr, hops + 1)
+        return load_source("{}.{}".format(item.name, attr))
+    if isinstance(item, SourceNode) and isinstance(item.node, ast.ClassDef):
+        owner, value = item.module.get_members(item).get(attr, (None, None))
+        if owner is not None:
+            return resolve(
+                owner.module, value, "{}.{}".format(owner.qualname, attr), hops + 1
+            )
+    return None
+
+
+def _is_typing(value):  # type: (Any) -> bool
+    return isinstance(value, Import) and value.module == "typing"
+
+
+def _decorators(node):  # type: (Any) -> List[str]
+    return [get_dotted(dec) for dec in getattr(node, "decorator_list", [])]
+
+
+def is_property(node):  # type: (Any) -> bool
+    """ property, cached_property, abstractproperty etc """
+    return any(
+        dec.split(".")[-1].endswith("property") for dec in _decorators(node)
+    ) or _is_accessor(node)
+
+
+def _is_accessor(node):  # type: (Any) -> bool
+    """ Property setter / getter / deleter """
+    return any(
+        dec.endswith((".setter", ".getter", ".deleter")) for dec in _decorators(node)
+    )
+
+
+# ------------------------------------------
+# Typing
+# ------------------------------------------
+
+
+def literal_type(node):  # type: (Any) -> str
+    """ Type of a value, as far as can be told from the source. """
+    if node is None:
+        return UNKNOWN
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        node = node.operand
+    value = _literal_value(node)
+    if value is None:
+        return "NoneType"
+    if value is Ellipsis:
+        return "ellipsis"
+    if value is not NOT_LITERAL:
+        return type(value).__name__
+    if isinstance(node, ast.List):
+        return "typing.List[{}]".format(
+            literal_type(node.elts[0]) if node.elts else UNKNOWN
+        )
+    if isinstance(node, ast.Set):
+        return "typing.Set[{}]".format(literal_type(node.elts[0]))
+    if isinstance(node, ast.Tuple):
+        internals = [literal_type(item) for item in node.elts]
+        if not internals:
+            internals = ["{}, ...".format(UNKNOWN)]
+        return "typing.Tuple[{}]".format(", ".join(internals))
+    if isinstance(node, ast.Dict):
+        if node.keys and node.keys[0] is not None:
+            return "typing.Dict[{}, {}]".format(
+                literal_type(node.keys[0]), literal_type(node.values[0])
+            )
+        return "typing.Dict[{}, {}]".format(UNKNOWN, UNKNOWN)
+    if isinstance(node, ast.Name) and node.id in BUILTIN_NAMES:
+        return node.id
+    return UNKNOWN
+
+
+class SourceType(object):
+    """ Render a type expression from source, in the context of its module. """
+
+    def __init__(self, module, node):  # type: (SourceModule, Any) -> None
+        self._module = module
+        self.type = self._render(node, 0)
+
+    @classmethod
+    def from_string(cls, module, type_string):  # type: (SourceModule, str) -> str
+        if UNKNOWN in type_string:
+            return type_string
+        try:
+            node = ast.parse(type_string.strip(), mode="eval").body
+        except SyntaxError:
+            LOG.warning("Invalid syntax in type '{}'".format(type_string))
+            return UNKNOWN
+        return cls(module, node).type
+
+    def _render(self, node, hops):  # type: (Any, int) -> str
+        if hops > 20:
+            return UNKNOWN
+        value = _literal_value(node)
+        if value is None:
+            return "NoneType"
+        if value is Ellipsis or type(node).__name__ == "Ellipsis":
+            return "..."
+        if isinstance(value, str if not PY2 else basestring):  # type: ignore
+            # Forward reference
+            try:
+                return self._render(ast.parse(value, mode="eval").body, hops + 1)
+            except SyntaxError:
+                return UNKNOWN
+        if isinstance(node, ast.List):
+            return "[{}]".format(", ".join(self._render(e, hops) for e in node.elts))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+            return UNKNOWN
+        if isinstance(node, ast.Subscript):
+            return self._render_subscript(node, hops)
+        name = get_dotted(node)
+        if not name:
+            return UNKNOWN
+        return self._qualify(node, name, hops)
+
+    def _render_subscript(self, node, hops):  # type: (Any, int) -> str
+        name = self._render(node.value, hops)
+        if name == UNKNOWN:
+            return UNKNOWN
+        index = node.slice
+        if type(index).__name__ == "Index":
+            index = index.value
+        args = [
+            self._render(arg, hops)
+            for arg in (index.elts if isinstance(index, ast.Tuple) else [index])
+        ]
+        if name == "typing.Optional":
+            name = "typing.Union"
+            args.append("NoneType")
+        if name == "typing.Union":
+            members = set()  # type: Set[str]
+            for arg in args:
+                if arg.startswith("typing.Union["):
+                    members.update(_split_args(arg[len("typing.Union[") : -1]))
+                else:
+                    members.add(arg)
+            if len(members) == 1:
+                return members.pop()
+            args = sorted(members)
+        return "{}[{}]".format(name, ", ".join(args))
+
+    def _qualify(self, node, name, hops):  # type: (Any, str, int) -> str
+        head, _, tail = name.partition(".")
+        value = self._module.bindings.get(head)
+        if value is None:
+            # Typing is available to annotations as a convenience
+            if name == "None":
+                return "NoneType"
+            if head == "typing" or tail:
+                return name
+            if head in typing.__all__:
+                return "typing." + name
+            if head in BUILTIN_NAMES:
+                return name
+            return UNKNOWN
+        if isinstance(value, Import) and value.module.split(".")[0] == "typing":
+            return ".".join(p for p in (value.module, value.name, tail) if p)
+
+        found = resolve(self._module, node, name)
+        if isinstance(found, SourceNode):
+            if isinstance(found.node, ast.ClassDef):
+                return "{}.{}".format(found.module.name, found.node.name)
+            if isinstance(found.node, FUNCTION_NODES):
+                return SourceFuncType(found).as_var()
+            if type(found.node).__name__ == "AnnAssign":
+                return SourceType(found.module, found.node.value)._render(
+                    found.node.value, hops + 1
+                )
+            if found.node is not None and not isinstance(
+                found.node, FUNCTION_NODES + (ast.Name, ast.Attribute)
+            ):
+                # Type alias
+                return SourceType(found.module, found.node)._render(
+                    found.node, hops + 1
+                )
+        if isinstance(found, Unresolved):
+            return ".".join(p for p in (found.module, found.name, tail) if p)
+        if isinstance(value, Import):
+            return ".".join(p for p in (value.module, value.name, tail) if p)
+        return UNKNOWN
+
+
+def _split_args(text):  # type: (str) -> List[str]
+    """ Split top level comma separated arguments """
+    args = []
+    depth = start = 0
+    for i, char in enumerate(text):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == "," and not depth:
+            args.append(text[start:i].strip())
+            start = i + 1
+    args.append(text[start:].strip())
+    return args
+
+
+def get_args(node):  # type: (Any) -> List[Tuple[str, int, Any, Any]]
+    """ Parameters of a function node. (name, kind, annotation, default) """
+    args = node.args
+    params = []
+    positional = getattr(args, "posonlyargs", []) + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    num_posonly = len(getattr(args, "posonlyargs", []))
+    for i, (arg, default) in enumerate(zip(positional, defaults)):
+        kind = Kind.POSITIONAL if i < num_posonly else Kind.POSITIONAL | Kind.KEYWORD
+        if default is not None:
+            kind |= Kind.DEFAULT
+        params.append(_arg(arg, kind, default))
+    if args.vararg:
+        params.append(_arg(args.vararg, Kind.POSITIONAL | Kind.VARIADIC, None))
+    for arg, default in zip(
+        getattr(args, "kwonlyargs", []), getattr(args, "kw_defaults", [])
+    ):
+        kind = Kind.KEYWORD | (0 if default is None else Kind.DEFAULT)
+        params.append(_arg(arg, kind, default))
+    if args.kwarg:
+        params.append(_arg(args.kwarg, Kind.KEYWORD | Kind.VARIADIC, None))
+    return params
+
+
+def _arg(arg, kind, default):  # type: (Any, int, Any) -> Tuple[str, int, Any, Any]
+    if isinstance(arg, str):  # Python 2 varargs
+        return arg, kind, None, default
+    if isinstance(arg, ast.Name):  # Python 2 args
+        return arg.id, kind, None, default
+    return arg.arg, kind, getattr(arg, "annotation", None), default
+
+
+class SourceFuncType(IDCache):
+    """ Collect typing information on a function, from its source """
+
+    def __init__(self, func):  # type: (SourceNode) -> None
+        self.params = collections.OrderedDict()  # type: Dict[str, str]
+        self.returns = UNKNOWN
+
+        module, node = func.module, func.node
+        args = get_args(node)
+        comment_types = docstring_types = None
+        if not isinstance(node, ast.Lambda):
+            comment_types = module.get_comment(node, [arg[0] for arg in args])
+            docstring = ast.get_docstring(node)
+            docstring_types = handle_google(docstring) if docstring else None
+
+        # Check annotations first, then type comments, then docstrings
+        for name, _, annotation, default in args:
+            if annotation is not None:
+                self.params[name] = SourceType(module, annotation).type
+            elif comment_types:
+                self.params[name] = SourceType.from_string(
+                    module, comment_types[0].get(name, UNKNOWN)
+                )
+            elif docstring_types:
+                self.params[name] = SourceType.from_string(
+                    module, docstring_types[0].get(name, UNKNOWN)
+                )
+            elif default is not None:
+                if _literal_value(default) is None:
+                    self.params[name] = "typing.Union[NoneType, {}]".format(UNKNOWN)
+                else:
+                    value = resolve(module, default, name)
+                    self.params[name] = (
+                        literal_type(value.node)
+                        if isinstance(value, SourceNode)
+                        else UNKNOWN
+                    )
+            else:
+                self.params[name] = UNKNOWN
+
+        returns = getattr(node, "returns", None)
+        if returns is not None:
+            self.returns = SourceType(module, returns).type
+        elif comment_types:
+            self.returns = SourceType.from_string(module, comment_types[1])
+        elif docstring_types:
+            self.returns = SourceType.from_string(module, docstring_types[1])
+
+    def as_var(self):
+        params = (
+            "[{}]".format(", ".join(self.params.values())) if self.params else "..."
+        )
+        return "typing.Callable[{}, {}]".format(params, self.returns)
+
+
+# ------------------------------------------
+# Items
+# ------------------------------------------
+
+
+class SourceItem(AstItem):
+    """ Wrap and traverse source """
+
+    __slots__ = []  # type: ignore
+
+    def __repr__(self):
+        return "<{}: {}>".format(self.__class__.__name__, self.item)
+
+
+class SourceModuleItem(SourceItem):
+    """ Wrap module source """
+
+    __slots__ = []  # type: ignore
+    by_type = True
+
+    ALL_FILTER = False
+
+    @staticmethod
+    def is_this_type(item, parent):
+        return isinstance(item, SourceModule)
+
+    def get_child(self, attr):
+        return resolve(self.item, self.item.bindings[attr], attr)
+
+    def get_children_names(self):
+        names = (
+            name
+            for name, value in self.item.bindings.items()
+            if name and not name.startswith("_") and not _is_typing(value)
+        )
+        if self.ALL_FILTER and "__all__" in self.item.bindings:
+            all_filter = set(self.item.get_public_names())
+            names = (name for name in names if name in all_filter)
+        return sorted(names)
+
+    def get_type(self):
+        return self.item.name
+
+    def get_path(self):
+        return self.item.name
+
+    def is_generated(self):  # type: () -> bool
+        return is_generated("".join(self.item.lines[:30]))
+
+
+class SourceClassItem(SourceItem):
+    """ Wrap class source """
+
+    __slots__ = []  # type: ignore
+
+    magic_methods = tuple("__{}__".format(_m) for _m in ("new", "init", "call"))
+
+    @staticmethod
+    def is_this_type(item, parent):
+        return isinstance(item, SourceNode) and isinstance(item.node, ast.ClassDef)
+
+    def get_children_names(self):
+        members = self.item.module.get_members(self.item)
+        names = [name for name in sorted(members) if not name.startswith("_")]
+        for attr in self.magic_methods:
+            if attr in members and isinstance(members[attr][1], FUNCTION_NODES):
+                names.append(attr)
+        return names
+
+    def get_child(self, attr):
+        owner, value = self.item.module.get_members(self.item)[attr]
+        return resolve(owner.module, value, "{}.{}".format(owner.qualname, attr))
+
+    def get_owner(self, name):  # type: (str) -> Optional[str]
+        """ Path to the base class the member was inherited from, if it was """
+        owner, _ = self.item.module.get_members(self.item)[name]
+        if owner.node is self.item.node:
+            return None
+        return "{}.{}".format(owner.module.name, owner.qualname)
+
+    def get_type(self):
+        return "{}.{}".format(self.item.module.name, self.item.qualname)
+
+    def get_path(self):
+        return self.get_type()
+
+
+class SourceFunctionItem(SourceItem):
+    """ Wrap function / method source """
+
+    __slots__ = []  # type: ignore
+
+    @staticmethod
+    def is_this_type(item, parent):
+        return (
+            isinstance(item, SourceNode)
+            and isinstance(item.node, FUNCTION_NODES)
+            and not is_property(item.node)
+        )
+
+    def get_child(self, attr):
+        for name, kind, annotation, default in get_args(self.item.node):
+            if name == attr:
+                return SourceArg(name, kind, annotation, default, self.item)
+        raise KeyError("Child {} not in {}".format(attr, self.item))
+
+    def get_children_names(self):
+        params = [arg[0] for arg in get_args(self.item.node)]
+        if isinstance(self.parent, SourceClassItem):
+            # Ignore "self" and "cls" as they are implementation details.
+            decorators = _decorators(self.item.node)
+            if "staticmethod" not in decorators or self.item.qualname.endswith(
+                ".__new__"
+            ):
+                params = params[1:]
+        return params
+
+    def get_return_type(self):
+        return SourceFuncType(self.item).returns
+
+    def get_path(self):
+        return "{}.{}".format(self.item.module.name, self.item.qualname)
+
+
+class SourceParameterItem(SourceItem):
+    """ Wrap function parameter source """
+
+    __slots__ = []  # type: ignore
+    by_type = True
+
+    @staticmethod
+    def is_this_type(item, parent):
+        return isinstance(item, SourceArg)
+
+    def get_type(self):
+        return SourceFuncType(self.item.func).params[self.item.name]
+
+    def get_kind(self):
+        return self.item.kind
+
+
+class SourceUnresolvedItem(SourceItem):
+    """ Wrap imports that could not be found """
+
+    __slots__ = []  # type: ignore
+    by_type = True
+
+    @staticmethod
+    def is_this_type(item, parent):
+        return isinstance(item, Unresolved)
+
+    @property
+    def path(self):
+        return ".".join(p for p in self.item if p)
+
+
+class SourceVarItem(SourceItem):
+    """ Wrap variable source. Fallback. """
+
+    __slots__ = []  # type: ignore
+    by_type = True
+
+    @staticmethod
+    def is_this_type(item, parent):
+        return True
+
+    def get_type(self):
+        node = getattr(self.item, "node", None)
+        if isinstance(node, FUNCTION_NODES):  # Property
+            return SourceFuncType(self.item).returns
+        if type(node).__name__ == "AnnAssign":
+            return SourceType(self.item.module, node.annotation).type
+        return literal_type(node)
@@ -6,13 +6,22 @@ if False:  # type checking
 import re
 import sys
 import types
+import time
+import heapq
 import logging
 import os.path
+import itertools
 import importlib
+import collections
+
+from multiprocessing.pool import ThreadPool
 
 from surface._base import *
-from surface._utils import clean_repr, clamp_string
+from surface._utils import Session, clean_repr, clamp_string, safe_repr
+from surface._comment import CommentIndex
+from surface._type import LiveType
 from surface._item_live import (
+    LiveItem,
     ErrorItem,
     ModuleItem,
     ClassItem,
@@ -23,6 +32,16 @@ from surface._item_live import (
     FunctionItem,
     ParameterItem,
 )
+from surface._item_source import (
+    find_source,
+    load_source,
+    SourceModuleItem,
+    SourceClassItem,
+    SourceFunctionItem,
+    SourceParameterItem,
+    SourceUnresolvedItem,
+    SourceVarItem,
+)
 
 
 LOG = logging.getLogger(__name__)
@@ -30,24 +49,101 @@ LOG = logging.getLogger(__name__)
 
 CircularWarn = "Circular Reference"
 DepthWarn = "Depth Exceeded"
+BudgetWarn = "Time Budget Exceeded"
+OverflowWarn = "Too Many Children"
+GeneratedWarn = "Generated Module"
+SlowWarn = "Slow Access"
+UnresolvedWarn = "Unresolved Import"
+
+
+class _Frame(object):
+    """ Progress through an item, while walking. """
+
+    __slots__ = (
+        "name",
+        "item",
+        "path",
+        "level",
+        "items",
+        "children",
+        "item_id",
+        "overflow",
+        "depth_exceeded",
+        "seen",
+        "truncated",
+        "unstable",
+        "volatile",
+        "session",
+    )
+
+    def __init__(self, name, item, path, level):  # type: (str, Any, str, int) -> None
+        self.name = name
+        self.item = item  # Holds the (weakly referenced) parent of children alive
+        self.path = path  # Dotted path walked to get here
+        self.level = level  # Recursable items above this one
+        self.items = iter(())  # type: Iterator[Tuple[str, Any]]
+        self.children = []  # type: List[Any]
+        self.item_id = None  # type: Optional[int]
+        self.overflow = 0  # Children left out, over the limit
+        self.depth_exceeded = False
+        self.seen = set()  # type: Set[int] # Recursable items walked within
+        self.truncated = False  # Depth was exceeded within
+        self.unstable = False  # Result depends on where or when it was walked
+        self.volatile = False  # Walked something that can change as modules import
+        self.session = None  # type: Optional[Session] # Caches for this item alone
+
+
+class _Pending(object):
+    """ Stand in for a type, until it is resolved in a later pass. """
+
+    __slots__ = ("item", "parent", "method", "type")
+
+    def __init__(self, item, method):  # type: (Any, str) -> None
+        self.item = item
+        self.parent = item.parent  # Parents are weakly held. Keep it for later.
+        self.method = method
+        self.type = None  # type: Optional[str]
+
+    def resolve(self):  # type: () -> str
+        if self.type is None:
+            self.type = getattr(self.item, self.method)()
+        return self.type
+
+
+def _resolve_group(group):  # type: (List[_Pending]) -> None
+    for pending in group:
+        pending.resolve()
+
+
+# A finished walk of an item, kept for reuse.
+_Memo = collections.namedtuple(
+    "_Memo", ("item", "api", "seen", "level", "truncated", "epoch")
+)
 
 import_reg = re.compile(r"__init__\.(py[cwd]?|so)$")
 
 
-def recurse(name):  # type: (str) -> List[str]
-    """ Given a module path, return paths to its children. """
+def recurse(name, static=False):  # type: (str, bool) -> List[str]
+    """ Given a module path, return paths to its children.
+        If static, find the children from source files without importing them. """
 
     stack = [name]
     paths = []
 
     while stack:
         import_name = stack.pop()
-        module = importlib.import_module(import_name)
-        paths.append(import_name)
-        try:
-            module_path = module.__file__
-        except AttributeError:
-            continue
+        if static:
+            module_path = find_source(import_name)
+            if module_path is None:
+                raise ImportError("No source found for {}".format(import_name))
+            paths.append(import_name)
+        else:
+            module = importlib.import_module(import_name)
+            paths.append(import_name)
+            try:
+                module_path = module.__file__
+            except AttributeError:
+                continue
 
         if not import_reg.search(module_path):
             paths.append(import_name)
@@ -66,9 +162,51 @@ def recurse(name):  # type: (str) -> List[str]
 
 
 class Traversal(object):
+
+    # Types to wrap items with, in order of precedence.
+    visitors = (
+        NoneItem,
+        EnumItem,
+        BuiltinItem,
+        ParameterItem,
+        FunctionItem,
+        ModuleItem,
+        ClassItem,
+        VarItem,
+    )  # type: Tuple[Any, ...]
+    recursable = (ModuleItem, ClassItem)  # type: Tuple[Any, ...]
+    # Types whose contents can change as other modules are imported.
+    volatile = (ModuleItem,)  # type: Tuple[Any, ...]
+    # Types that can be referred to by path, rather than followed.
+    referable = (ModuleItem, ClassItem, FunctionItem)  # type: Tuple[Any, ...]
+    # Types that can be marked as generated by a tool.
+    generatable = (ModuleItem,)  # type: Tuple[Any, ...]
+    # Types whose members can be inherited from a base.
+    inheritable = (ClassItem,)  # type: Tuple[Any, ...]
+    # Caches kept for the whole traversal, even with low_memory. One entry per file.
+    kept = (CommentIndex,)  # type: Tuple[Any, ...]
+
     def __init__(
-        self, exclude_modules=False, all_filter=False, depth=6
-    ):  # type: (bool, bool, int) -> None
+        self,
+        exclude_modules=False,
+        all_filter=False,
+        depth=6,
+        boundary=False,
+        time_budget=None,
+        max_children=None,
+        skip_generated=False,
+        user_repr=True,
+        inherited_refs=False,
+        static_attrs=False,
+        type_sample=20,
+        defer_types=False,
+        typing_jobs=1,
+        cache_limits=None,
+        low_memory=False,
+        slow_access=None,
+        skip_paths=None,
+        report_slow=0,
+    ):  # type: (bool, bool, int, bool, Optional[float], Optional[int], bool, bool, bool, bool, int, bool, int, Optional[Dict[Optional[str], Tuple[Optional[int], Optional[int]]]], bool, Optional[float], Optional[Iterable[str]], int) -> None
         LOG.debug(
             "Traversal created with {}".format(
                 ", ".join("{}={}".format(*var) for var in locals().items())
@@ -77,76 +215,466 @@ class Traversal(object):
         self.exclude_modules = exclude_modules  # Do not follow exposed modules
         self.all_filter = all_filter  # Mimic "import *"
         self.depth = depth  # How far down the rabbit hole do we go?
+        self.boundary = boundary  # Do not follow anything from other packages
+        self.time_budget = time_budget  # Seconds to spend on each module
+        self.max_children = max_children  # Summarize anything beyond this many
+        self.skip_generated = skip_generated  # Do not look inside generated modules
+        self.user_repr = user_repr  # Run __repr__ methods written in python
+        self.inherited_refs = inherited_refs  # Refer to inherited members by path
+        self.static_attrs = static_attrs  # Look up attributes without running anything
+        self.type_sample = type_sample  # Items of a container to type it by
+        # Resolve function types after walking, a source file at a time.
+        self.defer_types = defer_types or typing_jobs > 1
+        self.typing_jobs = typing_jobs  # Threads to resolve deferred types with
+        # Drop wrappers and types cached within a module or class, once it is walked.
+        self.low_memory = low_memory
+        self.slow_access = slow_access  # Seconds a child can take to look up
+        self.skip_paths = frozenset(skip_paths or ())  # Children not to look up
+        self.report_slow = report_slow  # How many of the slowest lookups to keep
+        self.slowest = []  # type: List[Tuple[float, str]] # Heap, quickest first
+        self.slow_paths = []  # type: List[str] # Lookups over slow_access
+        self._pending = []  # type: List[_Pending]
+        self._deadline = None  # type: Optional[float]
+        self._package = ""  # Package currently being traversed
+        # Walks of classes and modules, reused across every module this traverses.
+        # Not kept with low_memory, as each holds its live object and whole API.
+        self._memo = {}  # type: Dict[Tuple[Any, int], _Memo]
+        self._epoch = None  # type: Optional[int]
+        # Wrappers, signatures and types, kept for as long as this traversal is.
+        self._session = Session(cache_limits)
+        # Types whose children are walked. Their builders receive them as a tuple.
+        self.walkable = (ClassItem, FunctionItem) + (
+            () if self.exclude_modules else (ModuleItem,)
+        )  # type: Tuple[Any, ...]
         self.item_map = {
-            NoneItem: lambda n, s, p: API.Var(n, "NoneType"),
-            EnumItem: lambda n, s, p: API.Var(n, s.get_type()),
-            VarItem: lambda n, s, p: API.Var(n, s.get_type()),
-            BuiltinItem: lambda n, s, p: API.Var(n, s.get_type()),
-            ErrorItem: lambda n, s, p: API.Unknown(
+            NoneItem: lambda n, s, c: API.Var(n, "NoneType"),
+            EnumItem: lambda n, s, c: API.Var(n, s.get_type()),
+            VarItem: lambda n, s, c: API.Var(n, s.get_type(n)),
+            BuiltinItem: lambda n, s, c: API.Var(n, s.get_type()),
+            ErrorItem: lambda n, s, c: API.Unknown(
                 n, s.type, clamp_string(clean_repr(s.item))
             ),
-            ClassItem: lambda n, s, p: API.Class(
-                n, s.get_type(), tuple(self.walk(s, n, p.copy()))
+            ClassItem: lambda n, s, c: API.Class(n, s.get_type(), c),
+            ModuleItem: lambda n, s, c: API.Module(n, s.get_type(), c),
+            FunctionItem: lambda n, s, c: API.Func(
+                n, c, self._get_type(s, "get_return_type")
             ),
-            ModuleItem: lambda n, s, p: API.Module(
-                n,
-                s.get_type(),
-                tuple([] if self.exclude_modules else self.walk(s, n, p.copy())),
+            ParameterItem: lambda n, s, c: API.Arg(
+                n, self._get_type(s, "get_type"), s.get_kind()
             ),
-            FunctionItem: lambda n, s, p: API.Func(
-                n, tuple(self.walk(s, n, set(p))), s.get_return_type()
-            ),
-            ParameterItem: lambda n, s, p: API.Arg(n, s.get_type(), s.get_kind()),
         }  # type: Dict[Any, Any]
 
+    def __enter__(self):  # type: () -> Traversal
+        return self
+
+    def __exit__(self, *_):  # type: (Any) -> None
+        self.close()
+
+    def close(self):  # type: () -> None
+        """ Let go of everything collected while traversing. """
+        self._memo.clear()
+        self._session.clear()
+        self._epoch = None
+
+    def load(self, name):  # type: (str) -> Any
+        """ Get the module to traverse, by its import path. """
+        return importlib.import_module(name)
+
     def traverse(self, module):  # type: (Any) -> API.Module
         """ Entry point to generating an API representation. """
-        visitors = [
-            NoneItem,
-            EnumItem,
-            BuiltinItem,
-            ParameterItem,
-            FunctionItem,
-            ModuleItem,
-            ClassItem,
-            VarItem,
-        ]
         ModuleItem.ALL_FILTER = self.all_filter
-        name = module.__name__.rsplit(".", 1)[-1]
-        item = ModuleItem.wrap(visitors, module)
-        api = API.Module(name, module.__name__, tuple(self.walk(item, name, set())))
+        LiveItem.STATIC_ATTRS = self.static_attrs
+        LiveType.SAMPLE = self.type_sample
+        with self._session:
+            if self._epoch != len(sys.modules):
+                # Imports since last time may have added to modules. Look at them fresh.
+                self._epoch = len(sys.modules)
+                LiveItem.clear_cache()
+            self._package = module.__name__.split(".", 1)[0]
+            self._start_budget()
+            name = module.__name__.rsplit(".", 1)[-1]
+            item = ModuleItem.wrap(self.visitors, module)
+            api = API.Module(name, module.__name__, self.walk(item, name))
         return api
 
-    def walk(
-        self, current_item, current_name, path
-    ):  # type: (Any, str, Set[int]) -> Iterable[Any]
+    def walk(self, current_item, current_name):  # type: (Any, str) -> Tuple[Any, ...]
+        """ Collect the API beneath an item.
+            Uses an explicit stack, so depth is not bound by the recursion limit. """
+        path = set()  # type: Set[int] # Recursable items currently being walked
+        frame = self._enter(
+            current_item, current_name, path, current_item.get_path() or current_name
+        )
+        stack = []  # type: List[_Frame]
+        try:
+            while True:
+                for name, item in frame.items:
+                    if isinstance(item, API.Unknown):  # Too slow to look up
+                        frame.unstable = True
+                        frame.children.append(item)
+                        continue
+                    if frame.depth_exceeded:
+                        frame.truncated = True
+                        frame.children.append(
+                            API.Unknown(
+                                name,
+                                DepthWarn,
+                                safe_repr(item.item, user_repr=self.user_repr),
+                            )
+                        )
+                        continue
+                    if self._deadline is not None and time.time() >= self._deadline:
+                        frame.unstable = True
+                        frame.children.append(
+                            API.Unknown(
+                                name,
+                                BudgetWarn,
+                                safe_repr(item.item, user_repr=self.user_repr),
+                            )
+                        )
+                        continue
+                    if self.inherited_refs and isinstance(frame.item, self.inheritable):
+                        owner = frame.item.get_owner(name)
+                        if owner:
+                            frame.children.append(
+                                API.Ref(name, "{}.{}".format(owner, name))
+                            )
+                            continue
+                    api_gen = self.item_map.get(type(item))
+                    if not api_gen:
+                        continue
+                    if self.boundary and isinstance(item, self.referable):
+                        item_path = item.get_path()
+                        if item_path.split(".", 1)[0] != self._package:
+                            frame.children.append(API.Ref(name, item_path))
+                            continue
+                    if isinstance(item, self.recursable):
+                        memo = self._recall(item, path)
+                        if memo:
+                            frame.seen.update(memo.seen)
+                            frame.truncated |= memo.truncated
+                            frame.volatile |= memo.epoch is not None
+                            frame.children.append(
+                                memo.api
+                                if memo.api.name == name
+                                else memo.api._replace(name=name)
+                            )
+                            continue
+                    if isinstance(item, self.walkable):
+                        # Descend. Picking up where we left off once the child is done.
+                        stack.append(frame)
+                        frame = self._enter(
+                            item, name, path, "{}.{}".format(frame.path, name)
+                        )
+                        break
+                    frame.children.append(api_gen(name, item, ()))
+                else:
+                    if frame.overflow:
+                        frame.children.append(
+                            API.Unknown(
+                                "...", OverflowWarn, "{} more".format(frame.overflow)
+                            )
+                        )
+                    if frame.item_id is not None:
+                        path.remove(frame.item_id)
+                    if not stack:
+                        if self.defer_types:
+                            return self._fill_types(tuple(frame.children))
+                        return tuple(frame.children)
+                    child, frame = frame, stack.pop()
+                    api = self.item_map[type(child.item)](
+                        child.name, child.item, tuple(child.children)
+                    )
+                    self._leave(child)
+                    child.volatile |= isinstance(child.item, self.volatile)
+                    if (
+                        child.item_id is not None
+                        and not child.unstable
+                        and not self.low_memory
+                    ):
+                        self._memo[(type(child.item), child.item_id)] = _Memo(
+                            child.item.item,
+                            api,
+                            frozenset(child.seen),
+                            child.level,
+                            child.truncated,
+                            len(sys.modules) if child.volatile else None,
+                        )
+                    frame.seen.update(child.seen)
+                    frame.truncated |= child.truncated
+                    frame.unstable |= child.unstable
+                    frame.volatile |= child.volatile
+                    frame.children.append(api)
+        finally:
+            for open_frame in reversed(stack + [frame]):
+                self._leave(open_frame)
+
+    def _get_type(self, item, method):  # type: (Any, str) -> Any
+        """ Type of a function or parameter. Or a stand in, if deferring. """
+        if not self.defer_types:
+            return getattr(item, method)()
+        pending = _Pending(item, method)
+        self._pending.append(pending)
+        return pending
+
+    def _source_file(self, item):  # type: (Any) -> str
+        """ File the function (or parameters function) is defined in """
+        func = item.parent.item if isinstance(item, ParameterItem) else item.item
+        return getattr(getattr(func, "__code__", None), "co_filename", "")
+
+    def _fill_types(self, body):  # type: (Tuple[Any, ...]) -> Tuple[Any, ...]
+        """ Resolve deferred types, grouped by file. Then put them in place. """
+        groups = collections.OrderedDict()  # type: Dict[str, List[_Pending]]
+        for pending in self._pending:
+            groups.setdefault(self._source_file(pending.item), []).append(pending)
+        self._pending = []
+        LOG.debug("Resolving types in {} files".format(len(groups)))
+        if self.typing_jobs > 1 and len(groups) > 1:
+            pool = ThreadPool(self.typing_jobs)
+            try:
+                pool.map(_resolve_group, groups.values())
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for group in groups.values():
+                _resolve_group(group)
+
+        # Rebuild the tree. Shared nodes are rebuilt once, and stay shared.
+        filled = {}  # type: Dict[int, Any]
+        root = API.Module("", "", body)
+        stack = [
+            (root, iter(body), [])
+        ]  # type: List[Tuple[Any, Iterator[Any], List[Any]]]
+        while True:
+            node, children, done = stack[-1]
+            for child in children:
+                if id(child) in filled:
+                    done.append(filled[id(child)])
+                    continue
+                if isinstance(child, (API.Module, API.Class)):
+                    stack.append((child, iter(child.body), []))
+                    break
+                if isinstance(child, API.Func):
+                    stack.append((child, iter(child.args), []))
+                    break
+                if isinstance(child, API.Arg) and isinstance(child.type, _Pending):
+                    filled[id(child)] = child._replace(type=child.type.resolve())
+                    done.append(filled[id(child)])
+                    continue
+                done.append(child)
+            else:
+                stack.pop()
+                if isinstance(node, API.Func):
+                    returns = node.returns
+                    if isinstance(returns, _Pending):
+                        returns = returns.resolve()
+                    new_node = node._replace(args=tuple(done), returns=returns)
+                else:
+                    new_node = node._replace(body=tuple(done))
+                if not stack:
+                    return new_node.body
+                filled[id(node)] = new_node
+                stack[-1][2].append(new_node)
+
+    def _start_budget(self):  # type: () -> None
+        self._deadline = (
+            None if self.time_budget is None else time.time() + self.time_budget
+        )
+
+    def _enter(
+        self, current_item, current_name, path, item_path
+    ):  # type: (Any, str, Set[int], str) -> _Frame
         LOG.debug("Visiting: {}".format(current_item))
 
+        frame = _Frame(current_name, current_item, item_path, len(path))
+
         # Recursable types
-        depth_exceeded = False
-        if isinstance(current_item, (ModuleItem, ClassItem)):
+        if isinstance(current_item, self.recursable):
             if len(path) >= self.depth:
                 LOG.debug("Exceeded depth")
-                depth_exceeded = True
+                frame.depth_exceeded = True
 
             item_id = id(current_item.item)
             if item_id in path:
-                yield API.Unknown(
-                    current_name,
-                    CircularWarn,
-                    clamp_string(clean_repr(repr(current_item.item))),
+                frame.unstable = True
+                frame.children.append(
+                    API.Unknown(
+                        current_name,
+                        CircularWarn,
+                        safe_repr(current_item.item, user_repr=self.user_repr),
+                    )
                 )
-                return
+                return frame
             path.add(item_id)
+            frame.item_id = item_id
+            frame.seen.add(item_id)
 
-        for name, item in current_item.items():
-            if depth_exceeded:
-                yield API.Unknown(
-                    name, DepthWarn, clamp_string(clean_repr(repr(item.item)))
+        if (
+            self.skip_generated
+            and isinstance(current_item, self.generatable)
+            and current_item.is_generated()
+        ):
+            frame.children.append(
+                API.Unknown(
+                    current_name, GeneratedWarn, clamp_string(current_item.get_path())
                 )
-                continue
+            )
+            return frame
+
+        if self.low_memory and isinstance(current_item, self.recursable):
+            # Cache what is made within this item apart, to drop when it is done.
+            frame.session = self._session.child(self.kept).__enter__()
+        names = iter(current_item)  # type: Iterator[str]
+        if self.max_children is not None:
+            count = len(current_item)
+            if count > self.max_children:
+                LOG.debug("Too many children: {}".format(count))
+                frame.overflow = count - self.max_children
+                names = itertools.islice(names, self.max_children)
+        # Wrap children only as they are reached. Anything over the limit never is.
+        if self.report_slow or self.slow_access is not None or self.skip_paths:
+            frame.items = ((name, self._timed_child(frame, name)) for name in names)
+        else:
+            frame.items = ((name, current_item[name]) for name in names)
+        return frame
+
+    def _timed_child(self, frame, name):  # type: (_Frame, str) -> Any
+        """ Look up a child, keeping track of how long it takes.
+            If it is known to be slow, or turns out to be, stand in for it instead. """
+        path = "{}.{}".format(frame.path, name)
+        if path in self.skip_paths:
+            return API.Unknown(name, SlowWarn, "skipped")
+        start = time.time()
+        item = frame.item[name]
+        elapsed = time.time() - start
+        if self.report_slow:
+            if len(self.slowest) < self.report_slow:
+                heapq.heappush(self.slowest, (elapsed, path))
+            elif elapsed > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (elapsed, path))
+        if self.slow_access is not None and elapsed > self.slow_access:
+            LOG.debug("Slow access: {} ({}s)".format(path, elapsed))
+            self.slow_paths.append(path)
+            return API.Unknown(name, SlowWarn, "{:.2f}s".format(elapsed))
+        return item
+
+    @staticmethod
+    def _leave(frame):  # type: (_Frame) -> None
+        """ Drop the caches kept for the frame, if it has its own. """
+        if frame.session is not None:
+            frame.session.__exit__()
+            frame.session.clear()
+            frame.session = None
+
+    def _recall(self, item, path):  # type: (Any, Set[int]) -> Optional[_Memo]
+        """ Reuse an earlier walk of this item, if it would come out the same here. """
+        memo = self._memo.get((type(item), id(item.item)))
+        if not memo or not memo.seen.isdisjoint(path):
+            return None  # Never walked, or walking now would find a circular reference.
+        if memo.epoch is not None and memo.epoch != len(sys.modules):
+            return None  # Modules walked within may have gained imports since.
+        level = len(path)
+        if memo.level != level and (memo.truncated or memo.level < level):
+            return None  # Depth would cut this walk off at a different point.
+        return memo
+
 
-            item_type = type(item)
-            api_gen = self.item_map.get(item_type)
-            if api_gen:
-                yield api_gen(name, item, path)
+class StaticTraversal(Traversal):
+    """ Traverse source files, without importing or running any of it. """
+
+    visitors = (
+        SourceParameterItem,
+        SourceUnresolvedItem,
+        SourceFunctionItem,
+        SourceModuleItem,
+        SourceClassItem,
+        SourceVarItem,
+    )  # type: Tuple[Any, ...]
+    recursable = (SourceModuleItem, SourceClassItem)
+    volatile = ()  # type: Tuple[Any, ...]
+    referable = (SourceModuleItem, SourceClassItem, SourceFunctionItem)
+    generatable = (SourceModuleItem,)
+    inheritable = (SourceClassItem,)
+
+    def __init__(
+        self,
+        exclude_modules=False,
+        all_filter=False,
+        depth=6,
+        boundary=False,
+        time_budget=None,
+        max_children=None,
+        skip_generated=False,
+        user_repr=True,
+        inherited_refs=False,
+        static_attrs=False,
+        type_sample=20,
+        defer_types=False,
+        typing_jobs=1,
+        cache_limits=None,
+        low_memory=False,
+        slow_access=None,
+        skip_paths=None,
+        report_slow=0,
+    ):  # type: (bool, bool, int, bool, Optional[float], Optional[int], bool, bool, bool, bool, int, bool, int, Optional[Dict[Optional[str], Tuple[Optional[int], Optional[int]]]], bool, Optional[float], Optional[Iterable[str]], int) -> None
+        super(StaticTraversal, self).__init__(
+            exclude_modules,
+            all_filter,
+            depth,
+            boundary,
+            time_budget,
+            max_children,
+            skip_generated,
+            user_repr,
+            inherited_refs,
+            static_attrs,
+            type_sample,
+            defer_types,
+            typing_jobs,
+            cache_limits,
+            low_memory,
+            slow_access,
+            skip_paths,
+            report_slow,
+        )
+        self.walkable = (SourceClassItem, SourceFunctionItem) + (
+            () if self.exclude_modules else (SourceModuleItem,)
+        )
+        self.item_map = {
+            SourceVarItem: lambda n, s, c: API.Var(n, s.get_type()),
+            SourceUnresolvedItem: lambda n, s, c: (
+                API.Unknown(n, UnresolvedWarn, clamp_string(s.path))
+                if s.item.name
+                else API.Module(n, s.path, ())
+            ),
+            SourceClassItem: lambda n, s, c: API.Class(n, s.get_type(), c),
+            SourceModuleItem: lambda n, s, c: API.Module(n, s.get_type(), c),
+            SourceFunctionItem: lambda n, s, c: API.Func(
+                n, c, self._get_type(s, "get_return_type")
+            ),
+            SourceParameterItem: lambda n, s, c: API.Arg(
+                n, self._get_type(s, "get_type"), s.get_kind()
+            ),
+        }  # type: Dict[Any, Any]
+
+    def _source_file(self, item):  # type: (Any) -> str
+        func = item.item.func if isinstance(item, SourceParameterItem) else item.item
+        return func.module.path
+
+    def load(self, name):  # type: (str) -> Any
+        """ Get the parsed module to traverse, by its import path. """
+        source = load_source(name)
+        if source is None:
+            raise ImportError("No source found for {}".format(name))
+        return source
+
+    def traverse(self, module):  # type: (Any) -> API.Module
+        """ Entry point to generating an API representation, from a parsed module. """
+        SourceModuleItem.ALL_FILTER = self.all_filter
+        with self._session:
+            self._package = module.name.split(".", 1)[0]
+            self._start_budget()
+            name = module.name.rsplit(".", 1)[-1]
+            item = SourceModuleItem.wrap(self.visitors, module)
+            api = API.Module(name, module.name, self.walk(item, name))
+        return api
@@ -7,7 +7,6 @@ if False:  # type checking
 import re
 import ast
 import types
-import token
 import typing
 import logging
 import inspect
@@ -19,7 +18,7 @@ import collections
 from surface._base import UNKNOWN, PY2, TYPE_CHARS
 from surface._doc import parse_docstring
 from surface._comment import get_comment
-from surface._utils import FuncSig, Cache, IDCache, get_tokens
+from surface._utils import FuncSig, IDCache, Layers
 from surface._item_static import (
     ModuleAst,
     NameAst,
@@ -36,14 +35,23 @@ else:
 
 LOG = logging.getLogger(__name__)
 
+# Metaclass of typing objects. Gone from python 3.7.
+TYPING_META = getattr(typing, "TypingMeta", None)
+# Unions written as "int | None". From python 3.10.
+UNION_TYPE = getattr(types, "UnionType", None)
+# Builtin generics, eg: list[int]. From python 3.9.
+GENERIC_ALIAS = getattr(types, "GenericAlias", None)
+
 BUILTIN_TYPES = tuple(b for b in builtins.__dict__.values() if isinstance(b, type))
+# Position of each builtin type in the above, by id. Builtins are never collected.
+BUILTIN_INDEX = {}  # type: Dict[int, int]
+for _index, _builtin in enumerate(BUILTIN_TYPES):
+    BUILTIN_INDEX.setdefault(id(_builtin), _index)
 
 
 class FuncType(IDCache):
     """ Collect typing information on a function """
 
-    _cache = Cache()
-
     def __init__(self, func):
         self.params = collections.OrderedDict()
         self.returns = UNKNOWN
@@ -61,12 +69,16 @@ class FuncType(IDCache):
 
     def _map_params(self, sig):
         """ Check annotations first, then type comments, then docstrings """
+        comments = {}  # type: Dict[int, Any] # Parameters mostly share one source
         for name, param in sig.parameters.items():
             context = Context(param.context)
             if param.annotation is not FuncSig.EMPTY:
                 self.params[name] = AnnotationType(param.annotation, context).type
                 continue
-            comment_types = get_comment(param.source)
+            source_id = id(param.source)
+            if source_id not in comments:
+                comments[source_id] = get_comment(param.source)
+            comment_types = comments[source_id]
             if comment_types:
                 self.params[name] = AnnotationType(
                     comment_types[0].get(name, UNKNOWN), context
@@ -107,7 +119,8 @@ class FuncType(IDCache):
 class LiveType(IDCache):
     """ Get string representation of some object type """
 
-    _cache = Cache()
+    # Most items looked at to type a container, however big it is.
+    SAMPLE = 20
 
     def __init__(self, obj):  # type: (Any) -> None
         self._type = self._get_type(obj)
@@ -165,11 +178,13 @@ class LiveType(IDCache):
         obj_type = type(obj)
         if obj_type == type(None):
             return "NoneType"
-        for builtin_type in BUILTIN_TYPES:
-            if obj is builtin_type:
-                return obj.__name__
-            if obj_type is builtin_type:
-                return obj_type.__name__
+        # Whichever of the object or its type comes first among the builtins
+        obj_index = BUILTIN_INDEX.get(id(obj))
+        type_index = BUILTIN_INDEX.get(id(obj_type))
+        if obj_index is not None and (type_index is None or obj_index <= type_index):
+            return obj.__name__
+        if type_index is not None:
+            return obj_type.__name__
         return None
 
     def _handle_container(self, obj):
@@ -177,24 +192,25 @@ class LiveType(IDCache):
 
         # Sequences
         if obj_type == list:
-            return "typing.List[{}]".format(LiveType(obj[0]) if obj else UNKNOWN)
+            return "typing.List[{}]".format(self._sample_type(obj))
         if obj_type == tuple:
-            internals = [str(LiveType(item)) for item in obj]
+            internals = [str(LiveType(item)) for item in self._sample(obj)]
             if not internals:
-                internals = ["{}, ...".format(UNKNOWN)]
-            return "typing.Tuple[{}]".format(", ".join(internals))
+                return "typing.Tuple[{}, ...]".format(UNKNOWN)
+            if len(obj) == 1 or (len(obj) <= self.SAMPLE and len(set(internals)) > 1):
+                return "typing.Tuple[{}]".format(", ".join(internals))
+            # Same all the way through (or too long to spell out). Any length will do.
+            return "typing.Tuple[{}, ...]".format(self._unify(internals))
 
         # Hashies!
         if obj_type == set:
-            template = "typing.Set[{}]"
-            for item in obj:
-                return template.format(LiveType(item))
-            return template.format(UNKNOWN)
+            return "typing.Set[{}]".format(self._sample_type(obj))
         if obj_type == dict:
-            template = "typing.Dict[{}, {}]"
-            for k, v in obj.items():
-                return template.format(LiveType(k), LiveType(v))
-            return template.format(UNKNOWN, UNKNOWN)
+            keys = self._sample(obj)
+            return "typing.Dict[{}, {}]".format(
+                self._unify(str(LiveType(k)) for k in keys),
+                self._unify(str(LiveType(obj[k])) for k in keys),
+            )
 
         # Generators
         # IMPORTANT!
@@ -210,15 +226,124 @@ class LiveType(IDCache):
 
         return None
 
+    @classmethod
+    def _sample(cls, obj):  # type: (Any) -> List[Any]
+        """ Up to SAMPLE items. From the start and spread over the rest of a sequence.
+            Just from the start of anything else. """
+        size = len(obj)
+        if size <= cls.SAMPLE:
+            return list(obj)
+        if not isinstance(obj, (list, tuple)):
+            return list(itertools.islice(obj, cls.SAMPLE))
+        head = cls.SAMPLE // 2
+        rest = cls.SAMPLE - head
+        step = (size - 1 - head) // max(rest - 1, 1)
+        return list(obj[:head]) + [obj[head + i * step] for i in range(rest)]
+
+    def _sample_type(self, obj):  # type: (Any) -> str
+        """ Type covering the items of a container """
+        return self._unify(str(LiveType(item)) for item in self._sample(obj))
+
+    @staticmethod
+    def _unify(type_names):  # type: (Iterable[str]) -> str
+        """ One type covering all of those given """
+        unique = sorted(set(type_names))
+        if not unique:
+            return UNKNOWN
+        if len(unique) == 1:
+            return unique[0]
+        return "typing.Union[{}]".format(", ".join(unique))
+
+
+class TypingType(IDCache):
+    """ Render typing objects, by walking their origins and arguments.
+        Union members are sorted on the way. """
+
+    def __init__(self, obj):  # type: (Any) -> None
+        self._type = self._get_type(obj)
+
+    def __str__(self):
+        return self._type
+
+    @staticmethod
+    def is_typing(obj):  # type: (Any) -> bool
+        kind = type(obj)
+        if TYPING_META is not None:
+            return isinstance(obj, TYPING_META) or isinstance(kind, TYPING_META)
+        return kind.__module__ == "typing" or kind in (UNION_TYPE, GENERIC_ALIAS)
+
+    def _get_type(self, obj):  # type: (Any) -> str
+        args = getattr(obj, "__args__", None)
+        if not args:
+            return str(obj)  # Bare generics, TypeVar, Any etc
+        if type(obj) is UNION_TYPE:
+            return self._handle_union(args)
+        origin = getattr(obj, "__origin__", None)
+        if (
+            origin is None
+            or getattr(obj, "_special", False)  # Bare generics, from python 3.7
+            or hasattr(obj, "__metadata__")  # Annotated
+        ):
+            return str(obj)
+        if origin is typing.Union:
+            return self._handle_union(args)
+        name = getattr(obj, "_name", None)
+        head = "typing." + name if name else self._get_arg(origin)
+        if head == "typing.Callable":
+            return self._handle_callable(args)
+        return "{}[{}]".format(head, ", ".join(self._get_arg(arg) for arg in args))
+
+    def _handle_union(self, args):  # type: (Sequence[Any]) -> str
+        return "typing.Union[{}]".format(
+            ", ".join(sorted(self._get_arg(arg) for arg in args))
+        )
+
+    def _handle_callable(self, args):  # type: (Sequence[Any]) -> str
+        params, returns = args[:-1], self._get_arg(args[-1])
+        if params == (Ellipsis,):
+            return "typing.Callable[..., {}]".format(returns)
+        return "typing.Callable[[{}], {}]".format(
+            ", ".join(self._get_arg(param) for param in params), returns
+        )
+
+    @classmethod
+    def _get_arg(cls, obj):  # type: (Any) -> str
+        """ Arguments are written the way typing itself writes them """
+        if obj is Ellipsis:
+            return "..."
+        if obj is None:
+            return "NoneType"
+        if isinstance(obj, tuple) and not obj:
+            return "()"  # Empty tuple
+        if cls.is_typing(obj) or getattr(obj, "__args__", None):
+            return str(cls(obj))
+        if inspect.isclass(obj):
+            name = getattr(obj, "__qualname__", obj.__name__)
+            if obj.__module__ == builtins.__name__:
+                return name
+            return "{}.{}".format(obj.__module__, name)
+        return repr(obj)
+
 
 class Context(IDCache):
-    """ Clone and customize a provided context """
+    """ Names to evaluate types with. Layered over the provided context, rather than copied. """
+
+    # Injecting typing beneath the context for convenience. Shared by every context.
+    TYPING = dict(typing.__dict__, typing=typing)
+    # Evaluate with names from the context only (and builtins).
+    GLOBALS = {"__builtins__": builtins}
 
     def __init__(self, context):  # type: (Dict[str, Any]) -> None
-        # Injecting typing into the context for convenience
-        self.context = typing.__dict__.copy()
-        self.context["typing"] = typing
-        self.context.update(context)
+        # Imports found while evaluating. Kept to this context.
+        self.imports = {}  # type: Dict[str, Any]
+        # Imports that failed, not to be tried again.
+        self.missing = set()  # type: Set[str]
+        # Types worked out from strings. Unknown or not.
+        self.types = {}  # type: Dict[str, str]
+        self.context = Layers(self.imports, context, self.TYPING)
+
+    def eval(self, type_string):  # type: (str) -> Any
+        return eval(type_string, self.GLOBALS, self.context)
 
 
 class AnnotationType(object):
@@ -227,8 +352,14 @@ class AnnotationType(object):
 
     def __init__(self, obj, context):  # type: (Any, Context) -> None
         self._context = context
-        self.type = self._get_type(obj)
-        self.type = self._sort_union(self.type)
+        if not isinstance(obj, basestring if PY2 else str):  # type: ignore
+            self.type = self._get_type(obj)
+            return
+        # The same string is often found all over a module. Work it out once.
+        try:
+            self.type = context.types[obj]
+        except KeyError:
+            self.type = context.types[obj] = self._get_type(obj)
 
     def _get_type(self, obj):  # type: (Any) -> str
         if isinstance(obj, basestring if PY2 else str):  # type: ignore
@@ -259,17 +390,14 @@ class AnnotationType(object):
 
     @staticmethod
     def _handle_typing(obj):
-        if isinstance(obj, typing.TypingMeta) or isinstance(
-            type(obj), typing.TypingMeta
-        ):
-            return str(obj)
+        if TypingType.is_typing(obj):
+            return str(TypingType(obj))
         return None
 
     @staticmethod
     def _handle_builtin(obj):
-        for builtin_type in BUILTIN_TYPES:
-            if obj is builtin_type:
-                return obj.__name__
+        if id(obj) in BUILTIN_INDEX:
+            return obj.__name__
         return None
 
     @staticmethod
@@ -289,64 +417,15 @@ class AnnotationType(object):
         func = FuncType(obj)
         return func.as_var()
 
-    def _sort_union(self, type_string):
-        if "typing.Union" not in type_string:
-            return type_string
-        tokens = get_tokens(type_string)
-        num_tokens = len(tokens) - 1
-        replace = []
-        i = 1
-        while i < num_tokens:
-            i += 1
-            if not (
-                tokens[i][0] == token.NAME
-                and tokens[i][1] == "Union"
-                and tokens[i - 2][1] == "typing"
-            ):
-                continue
-            start = tokens[i + 2][2][1]  # First token inside braces
-            entries = []
-            marker = 0
-            brace = 0
-            while i < num_tokens:
-                i += 1
-                sub_tok = tokens[i]
-                if sub_tok[0] != token.OP:
-                    continue
-
-                if sub_tok[1] == "[":
-                    brace += 1
-                elif sub_tok[1] == "]":
-                    brace -= 1
-
-                if brace > 1:
-                    continue
-
-                if sub_tok[1] in "],":
-                    sub_type_string = type_string[marker : tokens[i - 1][3][1]]
-                    entries.append(self._sort_union(sub_type_string).strip())
-                if sub_tok[1] in "[,":
-                    marker = tokens[i + 1][2][1]
-
-                if not brace:
-                    break
-            end = tokens[i - 1][3][1]  # Last token inside braces
-            entries.sort()  # HERE! Sort those internals
-            replace.append((start, end, ", ".join(entries)))
-
-        for rep in sorted(replace, reverse=True):
-            type_string = type_string[: rep[0]] + rep[2] + type_string[rep[1] :]
-        return type_string
-
     def _eval_type(self, type_string):
         try:
             # Just try running it first. We might be lucky!
-            return eval(type_string, self._context.context)
+            return self._context.eval(type_string)
         except (NameError, AttributeError):
             # Retry the evaluation with an updated context
             self._include_imports(type_string)
             try:
-                return eval(type_string, self._context.context)
+                return self._context.eval(type_string)
             except (NameError, AttributeError) as err:
                 LOG.warning("Error in typing: {}".format(err))
                 raise
@@ -367,9 +446,9 @@ class AnnotationType(object):
                 continue
             for i in range(len(parts) - 1):
                 path = ".".join(parts[: i + 1])
-                if path in self._context.context:
+                if path in self._context.context or path in self._context.missing:
                     continue
                 try:
-                    self._context.context[path] = importlib.import_module(path)
+                    self._context.imports[path] = importlib.import_module(path)
                 except ImportError:
-                    pass
+                    self._context.missing.add(path)
@@ -3,14 +3,18 @@
 if False:
     from typing import *
 
+import io
 import re
 import sys
 import ast
+import json
 import time
 import types
 import inspect
+import itertools
 import logging
 import tokenize
+import threading
 import traceback
 import sigtools  # type: ignore
 import collections
@@ -19,8 +23,10 @@ from surface._base import *
 
 if PY2:
     from funcsigs import _empty  # type: ignore
+    from repr import Repr  # type: ignore
 else:
     from inspect import _empty  # type: ignore
+    from reprlib import Repr
 
 
 LOG = logging.getLogger(__name__)
@@ -39,6 +45,90 @@ def clamp_string(text, limit=200):  # type: (str, int) -> str
     return text[:cutoff] + "..." + text[text_len - cutoff :]
 
 
+generated_reg = re.compile(r"@generated|DO NOT EDIT")
+
+
+def is_generated(header):  # type: (str) -> bool
+    """ Check the top of a source file for a marker saying it was generated by a tool """
+    return bool(generated_reg.search(header))
+
+
+class BoundedRepr(Repr):
+    """ Repr that stops early, rather than building a huge string to be clamped.
+        Limits are sized from the clamp, so anything that would fit is shown in full.
+        Optionally avoids running __repr__ methods written in python. """
+
+    def __init__(self, limit=200, user_repr=True):  # type: (int, bool) -> None
+        Repr.__init__(self)
+        self.limit = limit
+        self.user_repr = user_repr
+        self.visits = 0
+        # Anything cut here is longer than the limit, and so clamped anyway.
+        # Each value takes at least one character, each nesting two (eg: "[]").
+        # Each entry ", " between them. Long values keep enough either side of the clamp.
+        self.maxstring = limit
+        self.maxlong = self.maxother = limit * 2 + 3
+        self.maxlevel = limit // 2
+        self.maxtuple = self.maxlist = self.maxarray = self.maxdeque = limit // 3
+        self.maxset = self.maxfrozenset = limit // 3
+        self.maxdict = limit // 6
+
+    def repr(self, x):  # type: (Any) -> str
+        self.visits = 0
+        return Repr.repr(self, x)
+
+    def repr1(self, x, level):  # type: (Any, int) -> str
+        # More values than characters allowed. Whatever is left will be clamped.
+        self.visits += 1
+        if self.visits > self.limit:
+            return "..."
+        if not self.user_repr:
+            method = getattr(type(x), "__repr__", None)
+            if isinstance(getattr(method, "__func__", method), types.FunctionType):
+                return object.__repr__(x)
+        return Repr.repr1(self, x, level)
+
+    def repr_str(self, x, level):  # type: (Any, int) -> str
+        if len(x) > self.maxstring * 2:
+            x = x[: self.maxstring] + x[-self.maxstring :]  # Middle is clamped away
+        return repr(x)
+
+    repr_bytes = repr_unicode = repr_str
+
+    def repr_dict(self, x, level):  # type: (Dict[Any, Any], int) -> str
+        # Entries kept in their own order (Repr sorts them)
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        pieces = [
+            "{}: {}".format(self.repr1(key, level - 1), self.repr1(x[key], level - 1))
+            for key in itertools.islice(x, self.maxdict)
+        ]
+        if len(x) > self.maxdict:
+            pieces.append("...")
+        return "{{{}}}".format(", ".join(pieces))
+
+    def repr_set(self, x, level):  # type: (Set[Any], int) -> str
+        if PY2:
+            return self._repr_iterable(x, level, "set([", "])", self.maxset)
+        if not x:
+            return "set()"
+        return self._repr_iterable(x, level, "{", "}", self.maxset)
+
+    def repr_frozenset(self, x, level):  # type: (FrozenSet[Any], int) -> str
+        if PY2:
+            return self._repr_iterable(x, level, "frozenset([", "])", self.maxset)
+        if not x:
+            return "frozenset()"
+        return self._repr_iterable(x, level, "frozenset({", "})", self.maxset)
+
+
+def safe_repr(obj, limit=200, user_repr=True):  # type: (Any, int, bool) -> str
+    """ Clamped, cleaned representation of an object, at a bounded cost """
+    return clamp_string(clean_repr(BoundedRepr(limit, user_repr).repr(obj)), limit)
+
+
 def get_tokens(source):  # type: (str) -> List[tokenize.TokenInfo]
     """ Tokenize string """
     try:
@@ -46,7 +136,10 @@ def get_tokens(source):  # type: (str) -> List[tokenize.TokenInfo]
             lines_str = (line for line in source.splitlines(True))
             tokens = list(tokenize.generate_tokens(lambda: next(lines_str)))
         else:
-            lines_bytes = (line.encode("utf-8") for line in source.splitlines(True))
+            # Split on line endings only. splitlines would also split on form feeds.
+            lines_bytes = (
+                line.encode("utf-8") for line in io.StringIO(source, newline="")
+            )
             tokens = list(tokenize.tokenize(lambda: next(lines_bytes)))
     except tokenize.TokenError:
         LOG.debug(traceback.format_exc())
@@ -54,53 +147,456 @@ def get_tokens(source):  # type: (str) -> List[tokenize.TokenInfo]
     return tokens
 
 
+if PY2:
+
+    def getattr_static(obj, attr):  # type: (Any, str) -> Any
+        """ Look up an attribute, without running descriptors or __getattr__.
+            A simple take on inspect.getattr_static, which python 2 lacks. """
+        if isinstance(obj, (type, types.ClassType)):
+            lookup = [obj] + list(inspect.getmro(obj))
+        else:
+            lookup = [obj] + list(inspect.getmro(type(obj)))
+        for scope in lookup:
+            namespace = getattr(scope, "__dict__", {})
+            if attr in namespace:
+                return namespace[attr]
+        raise AttributeError(attr)
+
+
+else:
+    from inspect import getattr_static
+
+
+def json_dumps(value, indent=None):  # type: (Any, Optional[int]) -> str
+    """ json.dumps(value, indent=indent, sort_keys=True),
+        for values nested deeper than the recursion limit too. """
+    try:
+        return json.dumps(value, indent=indent, sort_keys=True)
+    except RuntimeError:  # RecursionError in python 3
+        pass
+    item_sep = "," if indent is not None and not PY2 else ", "
+    chunks = []  # type: List[str]
+    # Each level holds what is left to write (with the text leading into it), and its closing.
+    stack = [
+        (iter([("", value)]), "")
+    ]  # type: List[Tuple[Iterator[Tuple[str, Any]], str]]
+    while stack:
+        items, closing = stack[-1]
+        for lead, val in items:
+            chunks.append(lead)
+            if not val or not isinstance(val, (dict, list, tuple)):
+                chunks.append(json.dumps(val))
+                continue
+            inner = outer = ""
+            if indent is not None:
+                inner = "\n" + " " * (indent * len(stack))
+                outer = "\n" + " " * (indent * (len(stack) - 1))
+            if isinstance(val, dict):
+                keys = sorted(val)
+                leads = [inner + json.dumps(key) + ": " for key in keys]
+                vals = [val[key] for key in keys]
+                chunks.append("{")
+                end = outer + "}"
+            else:
+                leads = [inner] * len(val)
+                vals = list(val)
+                chunks.append("[")
+                end = outer + "]"
+            leads[1:] = [item_sep + lead for lead in leads[1:]]
+            stack.append((iter(zip(leads, vals)), end))
+            break
+        else:
+            stack.pop()
+            chunks.append(closing)
+    return "".join(chunks)
+
+
+_JSON_SPACE = re.compile(r"[ \t\n\r]*")
+_JSON_CONSTANTS = {
+    "null": None,
+    "true": True,
+    "false": False,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+    "-Infinity": float("-inf"),
+}
+
+
+def json_loads(text):  # type: (str) -> Any
+    """ json.loads, for documents nested deeper than the recursion limit too. """
+    try:
+        return json.loads(text)
+    except RuntimeError:  # RecursionError in python 3
+        pass
+    root = []  # type: List[Any]
+    # Containers still being filled, along with the key their next value goes under.
+    stack = [[root, None]]  # type: List[List[Any]]
+    pos = _JSON_SPACE.match(text).end()
+    while True:
+        char = text[pos : pos + 1]
+        if char in ("{", "["):
+            value = {} if char == "{" else []  # type: Any
+            pos = _JSON_SPACE.match(text, pos + 1).end()
+            if text[pos : pos + 1] == ("}" if char == "{" else "]"):
+                pos += 1
+            else:
+                stack.append([value, None])
+                if char == "{":
+                    pos = _json_key(text, pos, stack[-1])
+                continue
+        elif char == '"':
+            value, pos = json.decoder.scanstring(text, pos + 1)
+        else:
+            for name, value in _JSON_CONSTANTS.items():
+                if text.startswith(name, pos):
+                    pos += len(name)
+                    break
+            else:
+                match = json.scanner.NUMBER_RE.match(text, pos)
+                if not match:
+                    raise ValueError("Expecting value at {}".format(pos))
+                integer, frac, exp = match.groups()
+                value = (
+                    float(integer + (frac or "") + (exp or ""))
+                    if frac or exp
+                    else int(integer)
+                )
+                pos = match.end()
+        # Store the value. Containers it completes are in turn stored in theirs.
+        while True:
+            container, key = stack[-1]
+            if isinstance(container, dict):
+                container[key] = value
+            else:
+                container.append(value)
+            pos = _JSON_SPACE.match(text, pos).end()
+            if len(stack) == 1:
+                if pos != len(text):
+                    raise ValueError("Extra data at {}".format(pos))
+                return root[0]
+            char = text[pos : pos + 1]
+            if char == ",":
+                pos = _JSON_SPACE.match(text, pos + 1).end()
+                if isinstance(container, dict):
+                    pos = _json_key(text, pos, stack[-1])
+                break
+            if char != ("}" if isinstance(container, dict) else "]"):
+                raise ValueError("Expecting ',' delimiter at {}".format(pos))
+            pos += 1
+            value = stack.pop()[0]
+
+
+def _json_key(text, pos, entry):  # type: (str, int, List[Any]) -> int
+    """ Read an object key into entry, returning where its value starts. """
+    if text[pos : pos + 1] != '"':
+        raise ValueError("Expecting property name at {}".format(pos))
+    entry[1], pos = json.decoder.scanstring(text, pos + 1)
+    pos = _JSON_SPACE.match(text, pos).end()
+    if text[pos : pos + 1] != ":":
+        raise ValueError("Expecting ':' delimiter at {}".format(pos))
+    return _JSON_SPACE.match(text, pos + 1).end()
+
+
+class CacheStats(object):
+    """ Running counts for every cache sharing a name """
+
+    def __init__(self):  # type: () -> None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.peak = 0  # Most entries held at once, by any one cache
+        self.peak_bytes = 0
+
+    def __repr__(self):
+        return "CacheStats(hits={}, misses={}, evictions={}, peak={}, peak_bytes={})".format(
+            self.hits, self.misses, self.evictions, self.peak, self.peak_bytes
+        )
+
+
+_PACKAGE = __name__.split(".", 1)[0]
+
+
+def get_size(value):  # type: (Any) -> int
+    """ Rough size of a value in bytes, along with everything it holds.
+        Measured through containers, syntax trees and our own objects. Anything else
+        (eg: modules, classes, functions) is counted alone, its contents are not ours.
+        Our own objects can define __sizeof__ to say what is theirs instead. """
+    size = 0
+    seen = set()  # type: Set[int]
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        kind = type(value)
+        if kind.__module__.split(".", 1)[0] == _PACKAGE:
+            if not _sizes_itself(kind):
+                stack.extend(_get_attrs(value))
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (tuple, list, set, frozenset)):
+            stack.extend(value)
+        elif isinstance(value, ast.AST):
+            stack.extend(_get_attrs(value))
+    return size
+
+
+def _sizes_itself(kind):  # type: (type) -> bool
+    """ Our class says what is its own, with __sizeof__ """
+    return any(
+        "__sizeof__" in vars(base)
+        for base in inspect.getmro(kind)
+        if base.__module__.split(".", 1)[0] == _PACKAGE
+    )
+
+
+def _get_attrs(value):  # type: (Any) -> List[Any]
+    """ Attribute values of an object, in its __dict__ and __slots__ """
+    attrs = list(getattr(value, "__dict__", {}).values())
+    for base in inspect.getmro(type(value)):
+        slots = vars(base).get("__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot.startswith("__") and not slot.endswith("__"):
+                slot = "_{}{}".format(base.__name__.lstrip("_"), slot)  # Mangled
+            try:
+                attrs.append(getattr(value, slot))
+            except AttributeError:
+                pass
+    return attrs
+
+
+def parse_limit(text):  # type: (str) -> Tuple[Optional[int], Optional[int]]
+    """ Read a cache limit. Plain numbers are entries, with a unit (kb, mb, gb) they are bytes. """
+    match = re.match(r"^\s*(\d+)\s*(b|kb?|mb?|gb?)?\s*$", text, re.I)
+    if not match:
+        raise ValueError(
+            "Cache limit '{}' should be a number of entries, or bytes with a unit eg: 500, 64mb".format(
+                text
+            )
+        )
+    num, unit = int(match.group(1)), match.group(2)
+    if not unit:
+        return num, None
+    return None, num * 1024 ** "bkmg".index(unit[0].lower())
+
+
 class Cache(collections.MutableMapping):
-    def __init__(self, size=500):  # type: (int) -> None
-        """ Cache stuff. Up to size (mb) """
+    """ Least recently used cache. Limited to a number of entries, or a size in bytes, or both. """
+
+    # Statistics for each named cache, shared between instances of the same name.
+    STATS = {}  # type: Dict[str, CacheStats]
+
+    def __init__(
+        self, size=500, max_bytes=None, name=""
+    ):  # type: (Optional[int], Optional[int], str) -> None
         self.size = size
+        self.max_bytes = max_bytes
+        self.name = name
+        self.bytes = 0
+        self.stats = self.STATS.setdefault(name, CacheStats()) if name else CacheStats()
+        self._sizes = {}  # type: Dict[Any, int]
         self._cache = (
             collections.OrderedDict()
         )  # type: collections.OrderedDict[Any, Any]
+        # Python 2 lacks move_to_end. Fall back to re-inserting.
+        self._touch = getattr(self._cache, "move_to_end", self._reinsert)
+        # Typing threads share the caches of a session. Check and change them in one step.
+        self._lock = threading.RLock()
+
+    def _reinsert(self, key):  # type: (Any) -> None
+        self._cache[key] = self._cache.pop(key)
 
     def __getitem__(self, key):  # type: (Any) -> Any
-        """ Move item to front of the queue """
-        item = self._cache.pop(key)
-        self._cache[key] = item
-        return item
+        """ Move item to the back of the queue, last to be dropped """
+        with self._lock:
+            try:
+                item = self._cache[key]
+            except KeyError:
+                self.stats.misses += 1
+                raise
+            self.stats.hits += 1
+            self._touch(key)
+            return item
+
+    def __contains__(self, key):  # type: (Any) -> bool
+        return key in self._cache
 
     def __setitem__(self, key, value):  # type: (Any, Any) -> None
         """ Add new item. Drop old items to make space """
-        try:
-            self._cache.pop(key)
-        except KeyError:
-            if len(self._cache) > self.size:
-                self._cache.popitem(last=False)
-        self._cache[key] = value
+        size = get_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._cache:
+                del self[key]
+            self._cache[key] = value
+            if self.max_bytes is not None:
+                self._sizes[key] = size
+                self.bytes += size
+            stats = self.stats
+            while self._cache and (
+                (self.size is not None and len(self._cache) > self.size)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                del self[next(iter(self._cache))]
+                stats.evictions += 1
+            if len(self._cache) > stats.peak:
+                stats.peak = len(self._cache)
+            if self.bytes > stats.peak_bytes:
+                stats.peak_bytes = self.bytes
 
     def __len__(self):
         return len(self._cache)
 
     def __iter__(self):
-        return iter(self._cache)
+        with self._lock:
+            return iter(list(self._cache))
 
     def __delitem__(self, key):  # type: (Any) -> None
-        del self._cache[key]
+        with self._lock:
+            del self._cache[key]
+            self.bytes -= self._sizes.pop(key, 0)
+
+    def clear(self):  # type: () -> None
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+
+def format_cache_stats():  # type: () -> str
+    """ Table of statistics collected by every named cache """
+    lines = [
+        "{:<16} {:>10} {:>10} {:>10} {:>8} {:>12}".format(
+            "cache", "hits", "misses", "evictions", "peak", "peak bytes"
+        )
+    ]
+    for name, stats in sorted(Cache.STATS.items()):
+        lines.append(
+            "{:<16} {:>10} {:>10} {:>10} {:>8} {:>12}".format(
+                name,
+                stats.hits,
+                stats.misses,
+                stats.evictions,
+                stats.peak,
+                stats.peak_bytes or "-",
+            )
+        )
+    return "\n".join(lines)
+
+
+class Layers(collections.MutableMapping):
+    """ Look through a stack of mappings, without copying them. The first to hold a name wins.
+        Writes go to the first layer only. """
+
+    def __init__(self, *layers):  # type: (Mapping[str, Any]) -> None
+        self.layers = layers
+
+    def __sizeof__(self):  # type: () -> int
+        # Layers are borrowed. eg: module namespaces
+        return object.__sizeof__(self) + sys.getsizeof(self.layers)
+
+    def __getitem__(self, key):  # type: (str) -> Any
+        for layer in self.layers:
+            try:
+                return layer[key]
+            except KeyError:
+                pass
+        raise KeyError(key)
+
+    def __contains__(self, key):  # type: (Any) -> bool
+        return any(key in layer for layer in self.layers)
+
+    def __setitem__(self, key, value):  # type: (str, Any) -> None
+        self.layers[0][key] = value  # type: ignore
+
+    def __delitem__(self, key):  # type: (str) -> None
+        del self.layers[0][key]  # type: ignore
+
+    def __iter__(self):  # type: () -> Iterator[str]
+        return iter(set().union(*self.layers))
+
+    def __len__(self):  # type: () -> int
+        return len(set().union(*self.layers))
+
 
+class Session(object):
+    """ Caches for one traversal. Dropped (memory and all) when it is done with.
+        Entries keep hold of the objects they were made for. So an id cannot be
+        reused by another object, while its entry is cached. """
 
-class IDCache(object):
-    """ Generic object that caches based on input object ID """
+    _active = []  # type: List[Session]
 
-    _cache = Cache()
-    _empty = object()
+    def __init__(
+        self, limits=None
+    ):  # type: (Optional[Dict[Optional[str], Tuple[Optional[int], Optional[int]]]]) -> None
+        # Entries and bytes for each cache by name. None for the rest.
+        self.limits = limits or {}
+        self._caches = {}  # type: Dict[Any, Cache]
 
-    def __new__(cls, item):
+    def __enter__(self):  # type: () -> Session
+        self._active.append(self)
+        return self
+
+    def __exit__(self, *_):  # type: (Any) -> None
+        self._active.pop()
+
+    @classmethod
+    def current(cls):  # type: () -> Session
+        """ Innermost session in use. Or the global one, outside of any. """
+        return cls._active[-1] if cls._active else GLOBAL_SESSION
+
+    def get_cache(self, owner):  # type: (Any) -> Cache
+        """ Cache belonging to the owner, within this session """
+        try:
+            return self._caches[owner]
+        except KeyError:
+            pass
+        name = getattr(owner, "__name__", str(owner))
+        size, max_bytes = self.limits.get(name, self.limits.get(None, (500, None)))
+        self._caches[owner] = cache = Cache(size, max_bytes, name)
+        return cache
+
+    def child(self, keep=()):  # type: (Sequence[Any]) -> Session
+        """ New session with the same limits. Sharing caches of the owners to keep. """
+        session = Session(self.limits)
+        for owner in keep:
+            session._caches[owner] = self.get_cache(owner)
+        return session
+
+    def clear(self):  # type: () -> None
+        self._caches.clear()
+
+
+GLOBAL_SESSION = Session()
+
+
+class _Keyed(tuple):
+    """ Object a cache entry was made for, and the entry. The object is borrowed. """
+
+    __slots__ = ()
+
+    def __sizeof__(self):  # type: () -> int
+        return tuple.__sizeof__(self) + get_size(self[1])
+
+
+class _IDCacheType(type):
+    def __call__(cls, item):  # type: ignore
+        cache = Session.current().get_cache(cls)
         item_id = id(item)
-        cache_item = cls._cache.get(item_id, cls._empty)
-        if cache_item is cls._empty:
-            cls._cache[item_id] = cache_item = super(IDCache, cls).__new__(cls)
+        cached = cache.get(item_id)
+        if cached is not None and cached[0] is item:
+            return cached[1]
+        cache_item = super(_IDCacheType, cls).__call__(item)
+        cache[item_id] = _Keyed((item, cache_item))
         return cache_item
 
 
+class IDCache(_IDCacheType("IDCacheBase", (object,), {})):  # type: ignore
+    """ Generic object that caches based on the input object. One instance per object, per session. """
+
+
 FuncSigArg = collections.namedtuple(
     "FuncSigArg", ("name", "kind", "default", "annotation", "source", "context")
 )
@@ -109,7 +605,6 @@ FuncSigArg = collections.namedtuple(
 class FuncSig(IDCache):
     """ Wrapper around sigtools signature gathering """
 
-    _cache = Cache()
     EMPTY = _empty
 
     _KIND_MAP = {
@@ -0,0 +1,131 @@
+""" Persistent API cache, for cli """
+
+if False:  # type checking
+    from typing import *
+
+import os as _os
+import sys as _sys
+import ast as _ast
+import json as _json
+import hashlib as _hashlib
+import tempfile as _tempfile
+
+from surface._item_source import (
+    find_source as _find_source,
+    load_source as _load_source,
+    _absolute_import,
+)
+
+
+class DiskCache(object):
+    """ Store serialized API's on disk, keyed by the source files that produced them. """
+
+    def __init__(self, root, version):  # type: (str, str) -> None
+        self._root = _os.path.realpath(root)
+        self._version = version
+        self._file_hashes = {}  # type: Dict[str, str]
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, module, options):  # type: (str, Sequence[Any]) -> Optional[str]
+        """ Build a key for the module, or None if it cannot be cached.
+            The key changes with the module source, or the source of anything it imports
+            from within its own package. Along with version and traversal options. """
+        sources = self._get_sources(module)
+        if not sources:
+            return None
+        meta = [self._version, list(_sys.version_info[:2]), module, list(options)]
+        digest = _hashlib.sha1(_json.dumps(meta).encode("utf-8"))
+        for path in sources:
+            digest.update(path.encode("utf-8"))
+            digest.update(self._hash_file(path).encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, key):  # type: (Optional[str]) -> Optional[str]
+        """ Load data under the key. None if it is not there. """
+        if key is not None:
+            try:
+                with open(self._get_path(key), "r") as handle:
+                    data = handle.read()
+            except IOError:
+                pass
+            else:
+                self.hits += 1
+                return data
+        self.misses += 1
+        return None
+
+    def save(self, key, data):  # type: (str, str) -> None
+        """ Save data under the key """
+        path = self._get_path(key)
+        directory = _os.path.dirname(path)
+        if not _os.path.isdir(directory):
+            _os.makedirs(directory)
+        # Write to the side and move into place, so a partial write is never loaded.
+        handle, temp = _tempfile.mkstemp(dir=directory)
+        with _os.fdopen(handle, "w") as temp_file:
+            temp_file.write(data)
+        if _os.path.isfile(path):
+            _os.remove(path)
+        _os.rename(temp, path)
+
+    def _get_path(self, key):  # type: (str) -> str
+        return _os.path.join(self._root, key[:2], key[2:] + ".json")
+
+    def _hash_file(self, path):  # type: (str) -> str
+        try:
+            return self._file_hashes[path]
+        except KeyError:
+            pass
+        with open(path, "rb") as handle:
+            file_hash = _hashlib.sha1(handle.read()).hexdigest()
+        self._file_hashes[path] = file_hash
+        return file_hash
+
+    def _get_sources(self, module):  # type: (str) -> List[str]
+        """ Source files of the module, and what it imports from its own package """
+        package = module.split(".", 1)[0]
+        stack = [module]
+        seen = set()
+        sources = []
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            path = _find_source(name)
+            if not path:
+                if name == module:
+                    return []  # Nothing to key off (eg: compiled module)
+                continue
+            sources.append(path)
+            source = _load_source(name)
+            if not source:
+                continue
+            for imported in self._get_imports(source):
+                if imported.split(".", 1)[0] == package:
+                    stack.append(imported)
+        return sorted(sources)
+
+    @staticmethod
+    def _get_imports(source):  # type: (Any) -> Set[str]
+        """ Every module the source could import, anywhere within it.
+            Including each parent of a dotted import (eg: a, a.b and a.b.c) """
+        names = set()
+        for node in _ast.walk(source.node):
+            if isinstance(node, _ast.Import):
+                targets = [alias.name for alias in node.names]
+            elif isinstance(node, _ast.ImportFrom):
+                base = _absolute_import(source, node.module or "", node.level or 0)
+                # Names imported from a package can be submodules
+                targets = [base] + [
+                    "{}.{}".format(base, alias.name)
+                    for alias in node.names
+                    if alias.name != "*"
+                ]
+            else:
+                continue
+            for target in targets:
+                parts = target.split(".")
+                names.update(".".join(parts[: i + 1]) for i in range(len(parts)))
+        return names
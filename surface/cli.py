@@ -8,13 +8,23 @@ import os as _os
 import sys as _sys
 import time as _time
 import json as _json
+import heapq as _heapq
 import os.path as _path
 import logging as _logging
 import datetime as _datetime
 import contextlib as _contextlib
+import multiprocessing as _multiprocessing
 import surface as _surface
 from surface.git import Store as _Store, Git as _Git
+from surface.cache import DiskCache as _DiskCache
+from surface._traversal import BudgetWarn as _BudgetWarn, SlowWarn as _SlowWarn
 from surface._base import PY2 as _PY2
+from surface._utils import (
+    format_cache_stats as _format_cache_stats,
+    json_dumps as _json_dumps,
+    json_loads as _json_loads,
+    parse_limit as _parse_limit,
+)
 
 if _PY2:
     import __builtin__ as _builtins  # type: ignore
@@ -27,6 +37,8 @@ _WINDOWS = _os.name == "nt"
 LOG = _logging.getLogger(__name__)
 
 import_times = {}  # type: Dict[str, float]
+slow_accesses = []  # type: List[Tuple[float, str]] # Slowest children looked up
+slow_paths = []  # type: List[str] # Children that took too long to look up
 
 
 @_contextlib.contextmanager
@@ -50,30 +62,6 @@ def time_imports():
         _builtins.__import__ = origin
 
 
-def to_dict(node):  # type: (Any) -> Any
-    """ Break a node structure (above types)
-        into a dict representation for serialization."""
-    data = {"class": type(node).__name__}  # type: Dict[str, Any]
-    for key, val in node._asdict().items():
-        if isinstance(
-            val,
-            (
-                _surface.API.Var,
-                _surface.API.Arg,
-                _surface.API.Func,
-                _surface.API.Class,
-                _surface.API.Module,
-                _surface.API.Unknown,
-            ),
-        ):
-            data[key] = to_dict(val)
-        elif isinstance(val, (tuple, list)):
-            data[key] = [to_dict(n) for n in val]
-        else:
-            data[key] = val
-    return data
-
-
 _api_lookup = {
     "Var": _surface.API.Var,
     "Arg": _surface.API.Arg,
@@ -81,18 +69,396 @@ _api_lookup = {
     "Class": _surface.API.Class,
     "Module": _surface.API.Module,
     "Unknown": _surface.API.Unknown,
+    "Ref": _surface.API.Ref,
 }
+_api_types = tuple(_api_lookup.values())
 
 
-def from_dict(node):  # type: (Dict[str, Any]) -> Any
-    """ Reassemble from a dict """
-    # Expand everything
-    node = {
-        k: tuple(from_dict(n) for n in v) if isinstance(v, (tuple, list)) else v
-        for k, v in node.items()
-    }
-    struct = _api_lookup[node.pop("class")]
-    return struct(**node)
+def to_dict(node, refs=None):  # type: (Any, Optional[Dict[Any, int]]) -> Any
+    """ Break a node structure (above types)
+        into a dict representation for serialization.
+        If refs are provided, repeated classes and modules are written out once.
+        Later occurrences refer back to them by id. """
+    # Dicts are handed out up front and filled in as their nodes come off the stack.
+    # Children go on in reverse, so nodes are visited (and given ids) in order.
+    root = {}  # type: Dict[str, Any]
+    stack = [(node, root)]  # type: List[Tuple[Any, Dict[str, Any]]]
+    while stack:
+        node, data = stack.pop()
+        data["class"] = type(node).__name__
+        if (
+            refs is not None
+            and isinstance(node, (_surface.API.Class, _surface.API.Module))
+            and node.body
+        ):
+            key = (type(node), node.path, node.body)
+            ref = refs.get(key)
+            if ref is not None:
+                data.update(name=node.name, path=node.path, ref=ref)
+                continue
+            refs[key] = data["id"] = len(refs)
+        children = []  # type: List[Tuple[Any, Dict[str, Any]]]
+        for key, val in node._asdict().items():
+            if isinstance(val, _api_types):
+                data[key] = {}
+                children.append((val, data[key]))
+            elif isinstance(val, (tuple, list)):
+                data[key] = [{} for _ in val]
+                children.extend(zip(val, data[key]))
+            else:
+                data[key] = val
+        stack.extend(reversed(children))
+    return root
+
+
+def from_dict(
+    node, refs=None
+):  # type: (Dict[str, Any], Optional[Dict[int, Any]]) -> Any
+    """ Reassemble from a dict.
+        Referenced bodies are collected in refs, and shared where they are referred to. """
+    if refs is None:
+        refs = {}
+    stack = [
+        (None, node) + _expand(node)
+    ]  # type: List[Tuple[Optional[str], Dict[str, Any], Iterator[Tuple[str, Any]], Dict[str, List[Any]]]]
+    while True:
+        _, node, children, done = stack[-1]
+        for key, child in children:
+            stack.append((key, child) + _expand(child))
+            break
+        else:
+            key, node, _, done = stack.pop()
+            fields = dict(node)
+            fields.update((name, tuple(vals)) for name, vals in done.items())
+            if "ref" in fields:
+                fields["body"] = refs[fields.pop("ref")]
+            if "id" in fields:
+                refs[fields.pop("id")] = fields["body"]
+            struct = _api_lookup[fields.pop("class")]
+            new_node = struct(**fields)
+            if not stack:
+                return new_node
+            stack[-1][3][key].append(new_node)
+
+
+def _expand(
+    node,
+):  # type: (Dict[str, Any]) -> Tuple[Iterator[Tuple[str, Any]], Dict[str, List[Any]]]
+    """ Children of a dict still to be reassembled, and where they go once they are. """
+    done = {
+        key: [] for key, val in node.items() if isinstance(val, (tuple, list))
+    }  # type: Dict[str, List[Any]]
+    return ((key, child) for key in done for child in node[key]), done
+
+
+_worker_traversal = None  # type: Any
+
+
+def _init_worker(paths, options):  # type: (List[str], Tuple[Any, ...]) -> None
+    """ Match the parents import paths in the worker processes.
+        Each worker keeps one traversal, so work is shared between its modules. """
+    global _worker_traversal
+    _sys.path[:] = paths
+    _worker_traversal = get_traversal(*options)
+
+
+def _dump_worker(
+    module,
+):  # type: (str) -> Tuple[str, Optional[Dict[str, Any]], str, float, List[Tuple[float, str]], List[str]]
+    """ Import and traverse a module inside a worker process.
+        API types cannot be pickled, so results are passed back as dicts. """
+    with time_imports():
+        try:
+            api = _worker_traversal.traverse(_worker_traversal.load(module))
+        except ImportError as err:
+            return module, None, str(err), 0.0, [], []
+    slowest, paths = _take_slow(_worker_traversal)
+    return module, to_dict(api), "", import_times.get(module, 0.0), slowest, paths
+
+
+def _take_slow(
+    traversal,
+):  # type: (_surface.Traversal) -> Tuple[List[Tuple[float, str]], List[str]]
+    """ Slow lookups the traversal has seen since last time. """
+    slowest, traversal.slowest = traversal.slowest, []
+    paths, traversal.slow_paths = traversal.slow_paths, []
+    return slowest, paths
+
+
+def get_options(
+    args,
+):  # type: (Any) -> Tuple[bool, bool, int, bool, bool, Optional[float], Optional[int], bool, bool, bool, bool, int]
+    """ Options that change the result of traversing. """
+    return (
+        args.exclude_modules,
+        args.all_filter,
+        args.depth,
+        args.static,
+        args.boundary,
+        args.time_budget,
+        args.max_children,
+        args.skip_generated,
+        not args.skip_user_repr,
+        args.inherited_refs,
+        args.static_attrs,
+        args.type_sample,
+    )
+
+
+def get_tuning(
+    args,
+):  # type: (Any) -> Tuple[bool, int, Dict[Optional[str], Tuple[Optional[int], Optional[int]]], bool, Optional[float], List[str], int]
+    """ Options that change how traversing is done, but not the result.
+        Or only change it in ways that are never cached (slow lookups). """
+    return (
+        args.defer_types,
+        args.typing_jobs,
+        get_cache_limits(args.cache_limit),
+        args.low_memory,
+        args.slow_access,
+        read_skip_paths(args.slow_skip),
+        args.report_slow,
+    )
+
+
+def read_skip_paths(path):  # type: (Optional[str]) -> List[str]
+    """ Dotted paths listed in the skip file, one per line. """
+    if not path or not _path.isfile(path):
+        return []
+    with open(path) as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+def write_skip_paths(path, paths):  # type: (str, Iterable[str]) -> None
+    """ Add paths to the skip file, for the next run to leave alone. """
+    new_paths = sorted(set(paths) - set(read_skip_paths(path)))
+    if new_paths:
+        with open(path, "a") as handle:
+            handle.writelines(p + "\n" for p in new_paths)
+
+
+def get_cache_limits(
+    limits,
+):  # type: (Optional[Sequence[str]]) -> Dict[Optional[str], Tuple[Optional[int], Optional[int]]]
+    """ Read cache limits in the form [NAME=]LIMIT. Without a name they apply to every cache. """
+    cache_limits = {}  # type: Dict[Optional[str], Tuple[Optional[int], Optional[int]]]
+    for limit in limits or ():
+        name, _, value = limit.rpartition("=")
+        cache_limits[name or None] = _parse_limit(value)
+    return cache_limits
+
+
+def get_traversal(
+    exclude_modules,
+    all_filter,
+    depth,
+    static,
+    boundary,
+    time_budget,
+    max_children,
+    skip_generated,
+    user_repr,
+    inherited_refs,
+    static_attrs,
+    type_sample,
+    defer_types=False,
+    typing_jobs=1,
+    cache_limits=None,
+    low_memory=False,
+    slow_access=None,
+    skip_paths=None,
+    report_slow=0,
+):  # type: (bool, bool, int, bool, bool, Optional[float], Optional[int], bool, bool, bool, bool, int, bool, int, Optional[Dict[Optional[str], Tuple[Optional[int], Optional[int]]]], bool, Optional[float], Optional[Iterable[str]], int) -> _surface.Traversal
+    """ Traversal to share between all modules in a run. """
+    return (_surface.StaticTraversal if static else _surface.Traversal)(
+        exclude_modules=exclude_modules,
+        all_filter=all_filter,
+        depth=depth,
+        boundary=boundary,
+        time_budget=time_budget,
+        max_children=max_children,
+        skip_generated=skip_generated,
+        user_repr=user_repr,
+        inherited_refs=inherited_refs,
+        static_attrs=static_attrs,
+        type_sample=type_sample,
+        defer_types=defer_types,
+        typing_jobs=typing_jobs,
+        cache_limits=cache_limits,
+        low_memory=low_memory,
+        slow_access=slow_access,
+        skip_paths=skip_paths,
+        report_slow=report_slow,
+    )
+
+
+def over_budget(
+    api, warnings=(_BudgetWarn,)
+):  # type: (_surface.API.Module, Tuple[str, ...]) -> bool
+    """ Check if the time budget (or other time limits) ran out while collecting this API. """
+    stack = [api]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _surface.API.Unknown) and node.type in warnings:
+            return True
+        if isinstance(node, (_surface.API.Class, _surface.API.Module)):
+            stack.extend(node.body)
+        elif isinstance(node, _surface.API.Func):
+            stack.extend(node.args)  # Parameters are walked too
+    return False
+
+
+def iter_api(
+    modules, args, cache=None
+):  # type: (Sequence[str], Any, Optional[_DiskCache]) -> Iterator[_surface.API.Module]
+    """ Collect the API of each module, in order. Reusing cached results where possible. """
+    options = get_options(args)
+    keys = {}  # type: Dict[str, Optional[str]]
+    cached = {}  # type: Dict[str, _surface.API.Module]
+    if cache:
+        for module in modules:
+            key = keys[module] = cache.get_key(module, options)
+            data = cache.load(key)
+            if data is not None:
+                cached[module] = from_dict(_json_loads(data))
+
+    results = _collect_api([m for m in modules if m not in cached], args)
+    for module in modules:
+        if module in cached:
+            yield cached[module]
+            continue
+        api = next(results)
+        key = keys.get(module)
+        if cache and key and not over_budget(api, (_BudgetWarn, _SlowWarn)):
+            # Running out of time is not repeatable. Try again next time.
+            cache.save(key, _json_dumps(to_dict(api)))
+        yield api
+
+
+def _collect_api(
+    modules, args
+):  # type: (Sequence[str], Any) -> Iterator[_surface.API.Module]
+    """ Collect the API of each module, in order. Spread across processes if requested. """
+    options = get_options(args) + get_tuning(args)
+    jobs = min(args.jobs, len(modules))
+    if jobs <= 1:
+        with get_traversal(*options) as traversal:
+            for module in modules:
+                try:
+                    api = traversal.traverse(traversal.load(module))
+                except ImportError as err:
+                    raise ImportError(module, err)
+                _add_slow(*_take_slow(traversal))
+                yield api
+        return
+
+    pool = _multiprocessing.Pool(jobs, _init_worker, (list(_sys.path), options))
+    try:
+        for result in pool.imap(_dump_worker, modules):
+            module, data, error, import_time, slowest, paths = result
+            if data is None:
+                raise ImportError(module, error)
+            import_times[module] = import_time
+            _add_slow(slowest, paths)
+            yield from_dict(data)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _add_slow(slowest, paths):  # type: (List[Tuple[float, str]], List[str]) -> None
+    slow_accesses.extend(slowest)
+    slow_paths.extend(paths)
+
+
+def dump_json(
+    module_api, meta, shared=False
+):  # type: (Iterable[_surface.API.Module], Dict[str, Any], bool) -> Iterator[str]
+    """ Serialize modules one at a time, as they arrive.
+        Text matches json.dumps of the whole dump (indent=2, sort_keys=True).
+        If shared, repeated classes and modules are written once across the dump. """
+    # Let json lay out everything around the modules, so separators and indentation match.
+    placeholder = "\0"
+    head, sep, tail = _json.dumps(
+        {"api": [placeholder, placeholder], "meta": meta}, indent=2, sort_keys=True
+    ).split(_json.dumps(placeholder))
+    refs = {} if shared else None  # type: Optional[Dict[Any, int]]
+    empty = True
+    for mod in module_api:
+        yield head if empty else sep
+        empty = False
+        # Strings never contain raw newlines, so nesting is a matter of indenting each line.
+        yield _json_dumps(to_dict(mod, refs), indent=2).replace("\n", "\n    ")
+    yield _json.dumps(
+        {"api": [], "meta": meta}, indent=2, sort_keys=True
+    ) if empty else tail
+
+
+def _tee(chunks, handle):  # type: (Iterable[str], IO[str]) -> Iterator[str]
+    for chunk in chunks:
+        handle.write(chunk)
+        yield chunk
+
+
+def _log_api(
+    module_api, args
+):  # type: (Iterable[_surface.API.Module], Any) -> Iterator[_surface.API.Module]
+    yellow = ("{}" if args.no_colour else "\033[33m{}\033[0m").format
+    for mod in module_api:
+        LOG.info(
+            "[{}]({:.2f}s)\n".format(
+                yellow(mod.path), round(import_times.get(mod.path, 0.0), 2)
+            )
+        )
+        LOG.info(_surface.format_api(mod.body, not args.no_colour, "    "))
+        yield mod
+
+
+def _track_budget(
+    module_api, budget_hits
+):  # type: (Iterable[_surface.API.Module], List[str]) -> Iterator[_surface.API.Module]
+    for mod in module_api:
+        if over_budget(mod):
+            budget_hits.append(mod.path)
+        yield mod
+
+
+def _save_dump(chunks, args):  # type: (Iterator[str], Any) -> None
+    """ Stream the dump to its destinations. Nothing is kept if it does not complete. """
+    # Write to the side, so a failure does not leave behind a partial file.
+    partial = "{}.partial".format(args.output) if args.output else None
+    handle = open(partial, "w") if partial else None
+    try:
+        if handle:
+            chunks = _tee(chunks, handle)
+        if args.git:
+            path = _path.realpath(args.git)
+            commit_hash = _Git().get_hash("HEAD")
+            store = _Store(path)
+            store.save(
+                " ".join([">>>", "surface"] + _sys.argv[1:]), commit_hash, chunks
+            )
+        else:
+            for _ in chunks:
+                pass
+    except BaseException:
+        if handle:
+            handle.close()
+            _os.remove(partial)
+        raise
+
+    if handle:
+        handle.close()
+        if _path.isfile(args.output):
+            _os.remove(args.output)
+        _os.rename(partial, args.output)
+        LOG.info("Saved API to {}".format(args.output))
+    if args.git:
+        LOG.info(
+            'Saved API as "{}", in branch "{}", to "{}"'.format(
+                commit_hash, store.BRANCH, path
+            )
+        )
 
 
 def run_dump(args):  # type: (Any) -> int
@@ -106,65 +472,72 @@ def run_dump(args):  # type: (Any) -> int
 
     with time_imports():
         modules = (
-            set(r for m in args.modules for r in _surface.recurse(m))
+            sorted(
+                set(r for m in args.modules for r in _surface.recurse(m, args.static))
+            )
             if args.recurse
             else args.modules
         )
 
-        module_api = []
-        for module in modules:
-            try:
-                api = _surface.get_api(
-                    module, args.exclude_modules, args.all_filter, args.depth
-                )
-            except ImportError as err:
-                LOG.info(
-                    (
-                        "Failed to import '{}'.\n"
-                        "{}\n"
-                        "Is the module and all its dependencies in your PYTHONPATH?"
-                    ).format(module, err)
-                )
-                return 1
+        # Modules are written out as they are collected, rather than held in memory.
+        if args.cache and not args.boundary:
+            # Without a boundary, other packages are written into the results too.
+            # Their sources would all need checking, costing more than the cache saves.
+            raise ValueError("--cache can only be used along with --boundary")
+        cache = _DiskCache(args.cache, _surface.__version__) if args.cache else None
+        module_api = iter_api(modules, args, cache)
+        if not args.quiet:
+            module_api = _log_api(module_api, args)
+        budget_hits = []  # type: List[str]
+        if args.time_budget is not None:
+            module_api = _track_budget(module_api, budget_hits)
+        try:
+            if args.output or args.git:
+                meta = {
+                    "created": str(_datetime.datetime.now()),
+                    "version": _surface.__version__,
+                    "command": " ".join(_sys.argv[1:]),
+                }
+                _save_dump(dump_json(module_api, meta, args.shared), args)
             else:
-                module_api.append(api)
-
-    if not args.quiet:
-        yellow = ("{}" if args.no_colour else "\033[33m{}\033[0m").format
-        for mod in module_api:
+                for _ in module_api:
+                    pass
+        except ImportError as err:
             LOG.info(
-                "[{}]({:.2f}s)\n".format(
-                    yellow(mod.path), round(import_times.get(mod.path, 0.0), 2)
+                (
+                    "Failed to import '{}'.\n"
+                    "{}\n"
+                    "Is the module and all its dependencies in your PYTHONPATH?"
+                ).format(*err.args)
+            )
+            return 1
+
+    if budget_hits:
+        LOG.info(
+            "Ran out of time ({}s) in: {}".format(
+                args.time_budget, ", ".join(budget_hits)
+            )
+        )
+    if args.report_slow and slow_accesses:
+        LOG.info(
+            "Slowest lookups:\n{}".format(
+                "\n".join(
+                    "    {:.3f}s {}".format(*access)
+                    for access in _heapq.nlargest(args.report_slow, slow_accesses)
                 )
             )
-            LOG.info(_surface.format_api(mod.body, not args.no_colour, "    "))
-
-    if args.output or args.git:
-        serialize = {
-            "meta": {
-                "created": str(_datetime.datetime.now()),
-                "version": _surface.__version__,
-                "command": " ".join(_sys.argv[1:]),
-            },
-            "api": [to_dict(mod) for mod in module_api],
-        }
-        data = _json.dumps(serialize, indent=2, sort_keys=True)
-
-        if args.output:
-            with open(args.output, "w") as handle:
-                handle.write(data)
-                LOG.info("Saved API to {}".format(args.output))
-        if args.git:
-            path = _path.realpath(args.git)
-            commit_hash = _Git().get_hash("HEAD")
-            store = _Store(path)
-            store.save(" ".join([">>>", "surface"] + _sys.argv[1:]), commit_hash, data)
+        )
+    if slow_paths:
+        LOG.info("Too slow to look up: {}".format(", ".join(slow_paths)))
+        if args.slow_skip:
+            write_skip_paths(args.slow_skip, slow_paths)
+    if not args.quiet:
+        if cache:
             LOG.info(
-                'Saved API as "{}", in branch "{}", to "{}"'.format(
-                    commit_hash, store.BRANCH, path
+                "Cache: {} hits, {} misses ({})".format(
+                    cache.hits, cache.misses, args.cache
                 )
             )
-    if not args.quiet:
         LOG.info("Took ({})".format(round(_time.time() - start, 3)))
     return 0
 
@@ -208,11 +581,16 @@ def run_compare(args):  # type: (Any) -> int
         with open(args.new, "r") as handle:
             new_data = handle.read()
 
+    # References can point anywhere earlier in the dump, so share lookup across modules.
+    old_refs = {}  # type: Dict[int, Any]
+    new_refs = {}  # type: Dict[int, Any]
     old_api = sorted(
-        (from_dict(mod) for mod in _json.loads(old_data)["api"]), key=lambda m: m.path
+        (from_dict(mod, old_refs) for mod in _json_loads(old_data)["api"]),
+        key=lambda m: m.path,
     )  # type: List[_surface.API.Module]
     new_api = sorted(
-        (from_dict(mod) for mod in _json.loads(new_data)["api"]), key=lambda m: m.path
+        (from_dict(mod, new_refs) for mod in _json_loads(new_data)["api"]),
+        key=lambda m: m.path,
     )  # type: List[_surface.API.Module]
 
     purple = ("{}" if args.no_colour else "\033[35m{}\033[0m").format
@@ -282,3 +660,4 @@ def profile(sort):
     yield
     prof.create_stats()
     prof.print_stats(sort=sort)
+    _sys.stdout.write(_format_cache_stats() + "\n")
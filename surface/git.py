@@ -22,8 +22,10 @@ class Store(object):
     def __init__(self, root):  # type: (str) -> None
         self._repo = Repo(root)
 
-    def save(self, message, hash, data):  # type: (str, str, str) -> None
-        """ Save data under corresponding hash """
+    def save(
+        self, message, hash, data
+    ):  # type: (str, str, Union[str, Iterable[str]]) -> None
+        """ Save data under corresponding hash. Data can be streamed in chunks. """
         root_hash = hash[: self._hash_break]
         base_hash = hash[self._hash_break :]
         # Get our root
@@ -33,7 +35,11 @@ class Store(object):
         base_tree = root_tree.get(root_hash)
         if not isinstance(base_tree, Tree):
             base_tree = self._repo.new_tree()
-        blob = self._repo.new_blob(data.encode("utf-8"))
+        blob = self._repo.new_blob(
+            data.encode("utf-8")
+            if hasattr(data, "encode")
+            else (chunk.encode("utf-8") for chunk in data)
+        )
         blob.save()
         base_tree = base_tree.set(base_hash, blob)
         base_tree.save()
@@ -73,7 +79,7 @@ class Git(object):
 
     def run_raw(
         self, cmds, input_=None
-    ):  # type: (Sequence[str], Optional[bytes]) -> bytes
+    ):  # type: (Sequence[str], Optional[Union[bytes, Iterable[bytes]]]) -> bytes
         try:
             cmd = [self.EXEC] + list(cmds)
             proc = _subprocess.Popen(
@@ -83,9 +89,20 @@ class Git(object):
                 stderr=_subprocess.PIPE,
                 cwd=self._root,
             )
-            output = proc.communicate(input_)
         except OSError:
             raise RuntimeError("Could not find git. Is it correctly installed?")
+        if input_ is None or isinstance(input_, bytes):
+            output = proc.communicate(input_)
+        else:
+            # Stream input in, so it never needs to be held in memory at once.
+            try:
+                for chunk in input_:
+                    proc.stdin.write(chunk)
+            except BaseException:
+                proc.kill()
+                proc.communicate()
+                raise
+            output = proc.communicate()
         if proc.returncode:
             raise self.FatalError(output[1].decode("utf-8").strip())
         return output[0]
@@ -249,5 +266,5 @@ class Repo(object):
     def new_tree(self):  # type: () -> Tree
         return Tree(self._git, {})
 
-    def new_blob(self, data):  # type: (bytes) -> Blob
+    def new_blob(self, data):  # type: (Union[bytes, Iterable[bytes]]) -> Blob
         return Blob(self._git, data)
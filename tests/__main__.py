@@ -1,12 +1,14 @@
 import sys
 import unittest
 
+# Before the others put testdata on the path, where a module of the same name lives.
+from test_utils import *
 from test_traversal import *
 from test_compare import *
 from test_type import *
-from test_utils import *
 from test_main import *
 from test_cli import *
+from test_cache import *
 
 
 unittest.main()
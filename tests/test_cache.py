@@ -0,0 +1,74 @@
+import os
+import sys
+import stat
+import shutil
+import tempfile
+import unittest
+
+from surface.cache import DiskCache
+from surface._item_source import _modules
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp, "source")
+        os.mkdir(self.source)
+        os.mkdir(os.path.join(self.source, "cachepkg"))
+        self.write("cachepkg/__init__.py", "from cachepkg.sub import func\n")
+        self.write("cachepkg/sub.py", "def func(a):\n    pass\n")
+        sys.path.insert(0, self.source)
+
+    def tearDown(self):
+        sys.path.remove(self.source)
+        for name in list(_modules):
+            if name.split(".", 1)[0] == "cachepkg":
+                del _modules[name]
+        shutil.rmtree(self.temp, onerror=self.remove_protected)
+
+    def remove_protected(self, action, name, exc):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+    def write(self, path, text):
+        with open(os.path.join(self.source, path), "w") as handle:
+            handle.write(text)
+
+    def get_cache(self, version="1.0.0"):
+        return DiskCache(os.path.join(self.temp, "cache"), version)
+
+    def test_save_load(self):
+        cache = self.get_cache()
+        key = cache.get_key("cachepkg", [False, False, 6, False])
+        self.assertIsNone(cache.load(key))
+        cache.save(key, "data")
+        self.assertEqual(cache.load(key), "data")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key(self):
+        options = [False, False, 6, False]
+        key = self.get_cache().get_key("cachepkg", options)
+        self.assertEqual(key, self.get_cache().get_key("cachepkg", options))
+        self.assertNotEqual(key, self.get_cache("1.0.1").get_key("cachepkg", options))
+        self.assertNotEqual(key, self.get_cache().get_key("cachepkg", [True]))
+        # Changes to imported sources within the package, change the key.
+        self.write("cachepkg/sub.py", "def func(a, b):\n    pass\n")
+        self.assertNotEqual(key, self.get_cache().get_key("cachepkg", options))
+
+    def test_key_dotted_import(self):
+        self.write("cachepkg/main.py", "import cachepkg.util\n")
+        self.write("cachepkg/util.py", "def helper(a):\n    pass\n")
+        options = [False, False, 6, False]
+        key = self.get_cache().get_key("cachepkg.main", options)
+        self.write("cachepkg/util.py", "def helper(a, b):\n    pass\n")
+        self.assertNotEqual(key, self.get_cache().get_key("cachepkg.main", options))
+
+    def test_no_source(self):
+        cache = self.get_cache()
+        key = cache.get_key("not_a_real_module", [])
+        self.assertIsNone(key)
+        self.assertIsNone(cache.load(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,21 @@
 import subprocess
+import json
 import unittest
 import tempfile
 import shutil
 import stat
+import sys
 import os
 
-from surface import bump_semantic_version, SemVer
+from surface import bump_semantic_version, SemVer, get_api, format_api, API, Changes
+from surface._base import Kind
+from surface._traversal import BudgetWarn, SlowWarn
+from surface._utils import json_loads
+from surface.cli import dump_json, to_dict, from_dict, over_budget
+
+path = os.path.join(os.path.dirname(__file__), "testdata")
+if path not in sys.path:
+    sys.path.insert(0, path)
 
 
 class TestRun(unittest.TestCase):
@@ -28,6 +38,58 @@ class TestRun(unittest.TestCase):
         command = ["surface", "-q", "dump", "--depth", "1", "-o", output, "surface"]
         subprocess.check_call(command)
 
+    def test_dump_jobs(self):
+        serial = os.path.join(self.temp, "serial.json")
+        parallel = os.path.join(self.temp, "parallel.json")
+        testdata = os.path.join(os.path.dirname(__file__), "testdata")
+        modules = ["test_mod_basic.myModule", "test_all_filter", "test_comments"]
+        command = ["surface", "-q", "dump", "-p", testdata] + modules
+        subprocess.check_call(command + ["-o", serial])
+        subprocess.check_call(command + ["-o", parallel, "--jobs", "3"])
+        with open(serial) as handle:
+            serial_api = json.load(handle)["api"]
+        with open(parallel) as handle:
+            parallel_api = json.load(handle)["api"]
+        self.assertEqual(serial_api, parallel_api)
+
+    def test_dump_cache(self):
+        cache = os.path.join(self.temp, "cache")
+        outputs = [os.path.join(self.temp, "out{}.json".format(i)) for i in range(2)]
+        testdata = os.path.join(os.path.dirname(__file__), "testdata")
+        modules = ["test_all_filter", "test_comments"]
+        command = ["surface", "-q", "dump", "-p", testdata, "--cache", cache]
+        with self.assertRaises(subprocess.CalledProcessError):
+            subprocess.check_call(command + modules)  # Needs --boundary
+        command.append("--boundary")
+        for output in outputs:
+            subprocess.check_call(command + modules + ["-o", output])
+        self.assertTrue(os.listdir(cache))
+        apis = []
+        for output in outputs:
+            with open(output) as handle:
+                apis.append(json.load(handle)["api"])
+        self.assertEqual(apis[0], apis[1])
+
+    def test_dump_cache_limit(self):
+        testdata = os.path.join(os.path.dirname(__file__), "testdata")
+        command = ["surface", "-q", "--profile", "tottime", "dump", "-p", testdata]
+        command += ["--cache-limit", "64kb", "--cache-limit", "FuncSig=10"]
+        output = subprocess.check_output(command + ["test_comments"])
+        self.assertIn(b"evictions", output)
+        self.assertIn(b"FuncSig", output)
+        command = ["surface", "-q", "dump", "--static", "-p", testdata]
+        subprocess.check_call(command + ["--cache-limit", "100", "test_comments"])
+
+    def test_dump_slow(self):
+        skip = os.path.join(self.temp, "skip.txt")
+        testdata = os.path.join(os.path.dirname(__file__), "testdata")
+        command = ["surface", "-q", "dump", "-p", testdata, "test_slow"]
+        command += ["--slow-access", "0.1", "--slow-skip", skip, "--report-slow", "3"]
+        subprocess.check_call(command)
+        subprocess.check_call(command)
+        with open(skip) as handle:
+            self.assertEqual(handle.read(), "test_slow.Holder.slow\n")
+
     def test_dump_git(self):
         command = [
             "surface",
@@ -73,5 +135,87 @@ class TestRun(unittest.TestCase):
         subprocess.check_call(command)
 
 
+class TestOverBudget(unittest.TestCase):
+    def test_over_budget(self):
+        arg = API.Arg("a", "int", Kind.POSITIONAL)
+        func = API.Func("func", (arg,), "int")
+        module = API.Module("mod", "mod", (API.Class("Class", "mod.Class", (func,)),))
+        self.assertFalse(over_budget(module))
+        body = (API.Unknown("func", BudgetWarn, "..."),)
+        self.assertTrue(over_budget(module._replace(body=body)))
+
+    def test_over_budget_args(self):
+        # Time can run out part way through a functions parameters
+        args = (
+            API.Arg("a", "int", Kind.POSITIONAL),
+            API.Unknown("b", BudgetWarn, "..."),
+        )
+        module = API.Module("mod", "mod", (API.Func("func", args, "int"),))
+        self.assertTrue(over_budget(module))
+        args = (API.Unknown("b", SlowWarn, "skipped"),)
+        module = API.Module("mod", "mod", (API.Func("func", args, "int"),))
+        self.assertFalse(over_budget(module))
+        self.assertTrue(over_budget(module, (BudgetWarn, SlowWarn)))
+
+
+class TestDumpJson(unittest.TestCase):
+    def test_matches_json(self):
+        meta = {"version": "1.0.0", "command": "dump test_comments"}
+        for names in ([], ["test_comments"], ["test_comments", "test_docstring"]):
+            module_api = [get_api(name) for name in names]
+            expect = json.dumps(
+                {"api": [to_dict(mod) for mod in module_api], "meta": meta},
+                indent=2,
+                sort_keys=True,
+            )
+            self.assertEqual(expect, "".join(dump_json(iter(module_api), meta)))
+
+    def test_shared(self):
+        body = (API.Var("var", "int"),)
+        module_api = [
+            API.Module(
+                "mod1",
+                "mod1",
+                (API.Class("A", "mod1.A", body), API.Class("B", "mod1.A", body)),
+            ),
+            API.Module(
+                "mod2",
+                "mod2",
+                (API.Class("A", "mod1.A", body), API.Class("C", "mod2.C", body)),
+            ),
+        ]
+        data = json.loads("".join(dump_json(iter(module_api), {}, shared=True)))
+        mod1, mod2 = data["api"]
+        ref = mod1["body"][0]["id"]
+        self.assertEqual(
+            mod1["body"][1],
+            {"class": "Class", "name": "B", "path": "mod1.A", "ref": ref},
+        )
+        self.assertEqual(mod2["body"][0]["ref"], ref)
+        self.assertEqual(mod2["body"][1]["body"], [to_dict(body[0])])
+
+        refs = {}
+        loaded = [from_dict(mod, refs) for mod in data["api"]]
+        self.assertEqual(loaded, module_api)
+        self.assertIs(loaded[0].body[0].body, loaded[1].body[0].body)
+
+    def test_deep(self):
+        # Deeper than the recursion limit
+        depth = sys.getrecursionlimit() + 500
+        node = API.Var("var", "int")
+        for i in reversed(range(depth)):
+            node = API.Class("C{}".format(i), "mod" + ".C" * i, (node,))
+        module = API.Module("mod", "mod", (node,))
+
+        text = "".join(dump_json(iter([module]), {}))
+        loaded = [from_dict(mod) for mod in json_loads(text)["api"]]
+        self.assertEqual(text, "".join(dump_json(iter(loaded), {})))
+        self.assertEqual(Changes().compare([module], loaded), set())
+
+        lines = format_api([module]).splitlines()
+        self.assertEqual(len(lines), depth + 2)
+        self.assertEqual(lines[-1], "    " * (depth + 1) + "var: int")
+
+
 if __name__ == "__main__":
     unittest.main()
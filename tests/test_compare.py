@@ -124,6 +124,23 @@ class TestCompare(unittest.TestCase):
         changes = Changes().compare(majorD, [])
         self.assertEqual(changes, set([Change("major", "Removed", "majorC")]))
 
+    def test_ref(self):
+        old = [API.Module("mod", "mod", (API.Ref("thing", "other.Thing"),))]
+        new = [API.Module("mod", "mod", (API.Ref("thing", "other.Other"),))]
+        self.assertEqual(Changes().compare(old, old), set())
+        self.assertEqual(
+            Changes().compare(old, new),
+            set(
+                [
+                    Change(
+                        "major",
+                        "Reference Changed",
+                        'mod.thing, Was: "other.Thing", Now: "other.Other"',
+                    )
+                ]
+            ),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
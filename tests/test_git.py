@@ -25,6 +25,13 @@ class TestGit(unittest.TestCase):
         store.save("mymessage", hash, data)
         self.assertEqual(data, store.load(hash))
 
+    def test_store_stream(self):
+        chunks = ["AB", "CD"]
+        hash = "a30a285157af49e1e4555ceec0ad341c1b0fc6e0"
+        store = Store(self.temp)
+        store.save("mymessage", hash, iter(chunks))
+        self.assertEqual("".join(chunks), store.load(hash))
+
     def test_store_multi(self):
         data = [
             ("a30a285157af49e1e4555ceec0ad341c1b0fc6e0", "ABCD"),
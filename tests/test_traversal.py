@@ -1,11 +1,26 @@
+import gc
 import sys
+import types
 import os.path
 import unittest
 
 from surface import get_api
-from surface._traversal import Traversal, recurse, CircularWarn, DepthWarn
+from surface._traversal import (
+    Traversal,
+    StaticTraversal,
+    recurse,
+    CircularWarn,
+    DepthWarn,
+    BudgetWarn,
+    OverflowWarn,
+    GeneratedWarn,
+    SlowWarn,
+    UnresolvedWarn,
+)
+from surface._item_source import load_source
+from surface._item_live import BuiltinItem, ClassItem, LiveItem, NoneItem, VarItem
 from surface._base import *
-from surface._utils import clean_repr
+from surface._utils import Session, clean_repr
 
 try:
     from importlib import reload
@@ -30,6 +45,18 @@ class TestRecurse(unittest.TestCase):
             ],
         )
 
+    def test_recurse_static(self):
+        paths = recurse("test_mod_recurse", static=True)
+        self.assertEqual(
+            paths,
+            [
+                "test_mod_recurse",
+                "test_mod_recurse.something",
+                "test_mod_recurse.submodule",
+                "test_mod_recurse.submodule.subsubmodule",
+            ],
+        )
+
 
 class TestImporter(unittest.TestCase):
 
@@ -367,6 +394,295 @@ class TestImporter(unittest.TestCase):
             ),
         )
 
+    def test_deep(self):
+        # Deeper than python would allow, if walking recursively
+        levels = sys.getrecursionlimit() + 100
+        module = types.ModuleType("deep_module")
+        parent = module
+        for i in range(levels):
+            child = type("Level{}".format(i), (object,), {})
+            setattr(parent, "level", child)
+            parent = child
+
+        data = Traversal(depth=levels + 1).traverse(module)
+        for _ in range(levels):
+            self.assertEqual(len(data.body), 1)
+            data = data.body[0]
+            self.assertIsInstance(data, API.Class)
+        self.assertEqual(data.body, ())
+
+    def test_shared_traversal(self):
+        class Meta(type):
+            gets = 0
+
+            def __getattribute__(cls, name):
+                if name == "value":
+                    Meta.gets += 1
+                return type.__getattribute__(cls, name)
+
+        def method(self, arg):
+            pass
+
+        Shared = Meta("Shared", (object,), {"value": 1, "method": method})
+        module1 = types.ModuleType("shared_module1")
+        module1.Shared = Shared
+        module2 = types.ModuleType("shared_module2")
+        module2.Alias = Shared
+        module2.func = method  # Not a method here. Should keep "self"
+
+        expect = [Traversal().traverse(module) for module in (module1, module2)]
+        traversal = Traversal()
+        self.assertEqual(traversal.traverse(module1), expect[0])
+        gets = Meta.gets
+        self.assertEqual(traversal.traverse(module2), expect[1])
+        self.assertEqual(Meta.gets, gets)  # Walked the class only the once
+        self.assertEqual(expect[1].body[0].name, "Alias")
+        self.assertEqual(
+            [arg.name for arg in expect[1].body[1].args], ["self", "arg"],
+        )
+
+    def test_time_budget(self):
+        import test_mod_basic
+
+        data = Traversal(time_budget=0).traverse(test_mod_basic)
+        self.assertTrue(data.body)
+        for node in data.body:
+            self.assertEqual(node.type, BudgetWarn)
+        data = Traversal(time_budget=60).traverse(test_mod_basic)
+        self.assertEqual(data, Traversal().traverse(test_mod_basic))
+
+    def test_max_children(self):
+        import test_generated
+
+        data = Traversal(max_children=2).traverse(test_generated)
+        self.assertEqual(
+            data.body,
+            (
+                API.Var("CONST_A", "int"),
+                API.Var("CONST_B", "int"),
+                API.Unknown("...", OverflowWarn, "3 more"),
+            ),
+        )
+        data = Traversal(max_children=5).traverse(test_generated)
+        self.assertEqual(data, Traversal().traverse(test_generated))
+
+    def test_skip_generated(self):
+        import test_generated
+
+        data = Traversal(skip_generated=True).traverse(test_generated)
+        self.assertEqual(
+            data.body,
+            (API.Unknown("test_generated", GeneratedWarn, "test_generated"),),
+        )
+        self.assertEqual(len(Traversal().traverse(test_generated).body), 5)
+
+    def test_inherited(self):
+        class Base(object):
+            def method(self, a):
+                pass
+
+            @classmethod
+            def create(cls, b):
+                pass
+
+        class Child(Base):
+            def other(self):
+                pass
+
+        module = types.ModuleType("inherited_module")
+        module.Base, module.Child = Base, Child
+        Base.__module__ = Child.__module__ = module.__name__
+        Base.__qualname__, Child.__qualname__ = "Base", "Child"
+
+        data = Traversal().traverse(module)
+        base, child = data.body
+        self.assertEqual(child.body[0], base.body[0])  # create
+        self.assertEqual(child.body[1], base.body[1])  # method
+        self.assertEqual([arg.name for arg in child.body[1].args], ["a"])
+
+        data = Traversal(inherited_refs=True).traverse(module)
+        self.assertEqual(data.body[0], base)
+        self.assertEqual(
+            data.body[1].body,
+            (
+                API.Ref("create", "inherited_module.Base.create"),
+                API.Ref("method", "inherited_module.Base.method"),
+                API.Func("other", (), UNKNOWN),
+            ),
+        )
+
+    def test_wrap(self):
+        class Local(object):
+            pass
+
+        visitors = Traversal.visitors
+        for _ in range(2):  # Once to learn the types, once to use what was learnt
+            self.assertIsInstance(ClassItem.wrap(visitors, int), BuiltinItem)
+            self.assertIsInstance(ClassItem.wrap(visitors, Local), ClassItem)
+            self.assertIsInstance(ClassItem.wrap(visitors, None), NoneItem)
+            self.assertIsInstance(ClassItem.wrap(visitors, Local()), VarItem)
+
+    def test_close(self):
+        import test_mod_basic
+
+        with Traversal() as traversal:
+            expect = traversal.traverse(test_mod_basic)
+            self.assertTrue(traversal._memo)
+            self.assertTrue(traversal._session.get_cache(LiveItem))
+        self.assertFalse(traversal._memo)
+        self.assertFalse(traversal._session.get_cache(LiveItem))
+        self.assertEqual(traversal.traverse(test_mod_basic), expect)
+
+    def test_static_attrs(self):
+        import test_static_attrs
+
+        expect = Traversal().traverse(test_static_attrs)
+        self.assertTrue(test_static_attrs._lookups)
+        del test_static_attrs._lookups[:]
+        data = Traversal(static_attrs=True).traverse(test_static_attrs)
+        self.assertEqual(test_static_attrs._lookups, [])
+        self.assertEqual(data, expect)
+
+    def test_slow_access(self):
+        import test_slow
+
+        traversal = Traversal(slow_access=0.1, report_slow=2)
+        data = traversal.traverse(test_slow)
+        holder = [node for node in data.body if node.name == "Holder"][0]
+        self.assertEqual(holder.body[0], API.Var("quick", "int"))
+        self.assertEqual(holder.body[1].name, "slow")
+        self.assertEqual(holder.body[1].type, SlowWarn)
+        self.assertEqual(traversal.slow_paths, ["test_slow.Holder.slow"])
+        self.assertEqual(max(traversal.slowest)[1], "test_slow.Holder.slow")
+
+        traversal = Traversal(skip_paths=["test_slow.Holder.slow"])
+        data = traversal.traverse(test_slow)
+        holder = [node for node in data.body if node.name == "Holder"][0]
+        self.assertEqual(holder.body[1], API.Unknown("slow", SlowWarn, "skipped"))
+        self.assertEqual(traversal.slow_paths, [])
+
+    def test_weak_parent(self):
+        class Local(object):
+            def method(self):
+                pass
+
+        with Session() as session:
+            parent = ClassItem.wrap(Traversal.visitors, Local)
+            child = parent["method"]
+            self.assertIs(child.parent, parent)
+            session.clear()
+            del parent
+            gc.collect()
+            self.assertIsNone(child.parent)
+
+    def test_low_memory(self):
+        import test_mod_basic
+        import test_comments
+        import test_docstring
+
+        for module in (test_mod_basic, test_comments, test_docstring):
+            expect = Traversal().traverse(module)
+            traversal = Traversal(low_memory=True)
+            self.assertEqual(traversal.traverse(module), expect)
+            self.assertFalse(traversal._memo)
+            data = Traversal(low_memory=True, defer_types=True).traverse(module)
+            self.assertEqual(data, expect)
+        self.assertFalse(Session._active)
+
+    def test_tiny_cache(self):
+        import json
+        import argparse
+        import test_mod_basic
+        import test_comments
+
+        class Base(object):
+            def method(self, a):  # type: (int) -> None
+                pass
+
+        class Child(Base):
+            pass
+
+        inherited = types.ModuleType("tiny_cache")
+        inherited.Base, inherited.Child = Base, Child
+        Base.__module__ = Child.__module__ = inherited.__name__
+
+        # Wrappers (and parents) evicted as soon as they are made
+        tiny = {None: (1, None)}
+        for module in (inherited, test_mod_basic, test_comments, json, argparse):
+            expect = Traversal().traverse(module)
+            self.assertEqual(Traversal(cache_limits=tiny).traverse(module), expect)
+            data = Traversal(cache_limits=tiny, typing_jobs=2).traverse(module)
+            self.assertEqual(data, expect)
+        method = Traversal(cache_limits=tiny).traverse(inherited).body[1].body[0]
+        self.assertEqual(
+            method.args, (API.Arg("a", "int", Kind.POSITIONAL | Kind.KEYWORD),)
+        )
+
+    def test_defer_types(self):
+        import test_mod_basic
+        import test_comments
+        import test_docstring
+
+        for module in (test_mod_basic, test_comments, test_docstring):
+            expect = Traversal().traverse(module)
+            self.assertEqual(Traversal(defer_types=True).traverse(module), expect)
+            self.assertEqual(Traversal(typing_jobs=2).traverse(module), expect)
+
+    def test_inherited_owner(self):
+        class Manager(object):
+            """ Only available on concrete classes. eg: django Model.objects """
+
+            def __get__(self, instance, owner):
+                if owner.abstract:
+                    raise AttributeError("Abstract class")
+                return "manager"
+
+        class Base(object):
+            abstract = True
+            manager = Manager()
+
+        class Child(Base):
+            abstract = False
+
+        module = types.ModuleType("inherited_owner")
+        module.Child = Child
+        Child.__module__ = module.__name__
+        Child.__qualname__ = "Child"
+
+        child = Traversal().traverse(module).body[0]
+        self.assertEqual(
+            child.body, (API.Var("abstract", "bool"), API.Var("manager", "str"))
+        )
+
+    def test_boundary(self):
+        import json
+        import collections
+
+        module = types.ModuleType("boundary_module")
+        module.json = json
+        module.OrderedDict = collections.OrderedDict
+        module.dumps = json.dumps
+        module.Local = type("Local", (object,), {"__module__": "boundary_module"})
+
+        sys.modules[module.__name__] = module
+        try:
+            data = Traversal(boundary=True).traverse(module)
+        finally:
+            del sys.modules[module.__name__]
+        self.assertEqual(
+            data,
+            API.Module(
+                "boundary_module",
+                "boundary_module",
+                (
+                    API.Class("Local", "boundary_module.Local", ()),
+                    API.Ref("OrderedDict", "collections.OrderedDict"),
+                    API.Ref("dumps", "json.dumps"),
+                    API.Ref("json", "json"),
+                ),
+            ),
+        )
+
     def test_stdlib(self):
         # Run through standard lib to see if anything breaks
         modules = sys.builtin_module_names
@@ -375,5 +691,138 @@ class TestImporter(unittest.TestCase):
             self.assertTrue(len(data))
 
 
+class TestStatic(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_matches_live(self):
+        import test_comments, test_docstring, test_exclude_modules
+
+        for module in (test_comments, test_docstring):
+            self.assertEqual(
+                StaticTraversal().traverse(load_source(module.__name__)),
+                Traversal().traverse(module),
+            )
+        self.assertEqual(
+            StaticTraversal(exclude_modules=True).traverse(
+                load_source("test_exclude_modules")
+            ),
+            Traversal(exclude_modules=True).traverse(test_exclude_modules),
+        )
+
+    def test_all_filter(self):
+        data = StaticTraversal(all_filter=True).traverse(load_source("test_all_filter"))
+        self.assertEqual(
+            data,
+            API.Module(
+                "test_all_filter",
+                "test_all_filter",
+                (API.Func("A", (), UNKNOWN), API.Func("B", (), UNKNOWN)),
+            ),
+        )
+
+    def test_static(self):
+        data = StaticTraversal().traverse(load_source("test_static"))
+        method = API.Func(
+            "method", (API.Arg("a", "int", Kind.POSITIONAL | Kind.KEYWORD),), "str"
+        )
+        self.assertEqual(
+            data,
+            API.Module(
+                "test_static",
+                "test_static",
+                (
+                    API.Class("Base", "test_static.Base", (method,)),
+                    API.Class(
+                        "Child",
+                        "test_static.Child",
+                        (method, API.Var("prop", "test_static.Base")),
+                    ),
+                    API.Unknown("Thing", UnresolvedWarn, "not_a_real_package.Thing"),
+                    API.Func(
+                        "alias",
+                        (
+                            API.Arg("a", UNKNOWN, Kind.POSITIONAL | Kind.KEYWORD),
+                            API.Arg("b", UNKNOWN, Kind.POSITIONAL | Kind.KEYWORD),
+                            API.Arg("c", UNKNOWN, Kind.KEYWORD | Kind.VARIADIC),
+                        ),
+                        UNKNOWN,
+                    ),
+                    API.Func(
+                        "func",
+                        (
+                            API.Arg(
+                                "a",
+                                "not_a_real_package.Thing",
+                                Kind.POSITIONAL | Kind.KEYWORD,
+                            ),
+                            API.Arg(
+                                "b",
+                                "test_static.Base",
+                                Kind.POSITIONAL | Kind.KEYWORD | Kind.DEFAULT,
+                            ),
+                        ),
+                        "not_a_real_module.Type",
+                    ),
+                    API.Module("not_a_real_module", "not_a_real_module", ()),
+                ),
+            ),
+        )
+
+    def test_boundary(self):
+        data = StaticTraversal(boundary=True).traverse(load_source("test_static"))
+        self.assertIn(API.Ref("alias", "test_mod_basic.myFunc"), data.body)
+
+    def test_inherited_refs(self):
+        data = StaticTraversal(inherited_refs=True).traverse(load_source("test_static"))
+        child = [node for node in data.body if node.name == "Child"][0]
+        self.assertEqual(
+            child.body,
+            (
+                API.Ref("method", "test_static.Base.method"),
+                API.Var("prop", "test_static.Base"),
+            ),
+        )
+
+    def test_defer_types(self):
+        expect = StaticTraversal().traverse(load_source("test_static"))
+        data = StaticTraversal(typing_jobs=2).traverse(load_source("test_static"))
+        self.assertEqual(data, expect)
+
+    def test_low_memory(self):
+        expect = StaticTraversal().traverse(load_source("test_static"))
+        data = StaticTraversal(low_memory=True).traverse(load_source("test_static"))
+        self.assertEqual(data, expect)
+
+    def test_max_children(self):
+        data = StaticTraversal(max_children=1).traverse(load_source("test_generated"))
+        self.assertEqual(
+            data.body,
+            (API.Var("CONST_A", "int"), API.Unknown("...", OverflowWarn, "4 more")),
+        )
+
+    def test_skip_generated(self):
+        data = StaticTraversal(skip_generated=True).traverse(
+            load_source("test_generated")
+        )
+        self.assertEqual(
+            data.body,
+            (API.Unknown("test_generated", GeneratedWarn, "test_generated"),),
+        )
+        data = StaticTraversal(skip_generated=True).traverse(load_source("test_static"))
+        self.assertEqual(data, StaticTraversal().traverse(load_source("test_static")))
+
+    def test_depth(self):
+        data = StaticTraversal(depth=1).traverse(load_source("test_static"))
+        self.assertEqual(
+            data.body[0],
+            API.Class(
+                "Base",
+                "test_static.Base",
+                (API.Unknown("method", DepthWarn, "<function Base.method>"),),
+            ),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
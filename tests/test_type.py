@@ -1,9 +1,11 @@
 import sys
+import typing
 import os.path
 import unittest
 
 from surface._base import PY2
-from surface._type import LiveType, FuncType, AnnotationType, Context
+from surface._type import LiveType, TypingType, FuncType, AnnotationType, Context
+from surface._comment import CommentIndex
 
 path = os.path.join(os.path.dirname(__file__), "testdata")
 if path not in sys.path:
@@ -32,6 +34,30 @@ class TestLiveType(unittest.TestCase):
         self.assertEqual("typing.Dict[int, str]", str(LiveType({123: "456"})))
         self.assertEqual("typing.Iterable[int]", str(LiveType((a for a in range(5)))))
 
+    def test_collections_sample(self):
+        self.assertEqual("typing.Tuple[int]", str(LiveType((1,))))
+        self.assertEqual("typing.Tuple[int, ...]", str(LiveType((1, 2, 3))))
+        self.assertEqual(
+            "typing.List[typing.Union[int, str]]", str(LiveType([1, "a", 2]))
+        )
+        self.assertEqual(
+            "typing.Dict[str, typing.Union[NoneType, int]]",
+            str(LiveType({"a": 1, "b": None})),
+        )
+        # Big tables cost no more than the sample
+        table = tuple(range(100000))
+        self.assertEqual("typing.Tuple[int, ...]", str(LiveType(table)))
+        self.assertEqual(
+            "typing.Tuple[typing.Union[int, str], ...]",
+            str(LiveType(table + ("end",))),
+        )
+        mixed = tuple(i if i % 2 else str(i) for i in range(100000))
+        self.assertEqual(
+            "typing.Tuple[typing.Union[int, str], ...]", str(LiveType(mixed))
+        )
+        big = dict((i, i) for i in range(100000))
+        self.assertEqual("typing.Dict[int, int]", str(LiveType(big)))
+
     def test_abstract(self):
         self.assertEqual(
             "typing.Callable[[~unknown], ~unknown]", str(LiveType(lambda x: 123))
@@ -84,6 +110,99 @@ class TestAnnotations(unittest.TestCase):
         )
 
 
+class TestTypingType(unittest.TestCase):
+    def test_render(self):
+        T = typing.TypeVar("T")
+        self.assertEqual(str(TypingType(typing.Dict[str, T])), "typing.Dict[str, ~T]")
+        self.assertEqual(
+            str(TypingType(typing.Callable[..., None])),
+            "typing.Callable[..., NoneType]",
+        )
+        self.assertEqual(
+            str(TypingType(typing.Callable[[int, str], typing.Tuple[()]])),
+            "typing.Callable[[int, str], typing.Tuple[()]]",
+        )
+        self.assertEqual(
+            str(TypingType(typing.Tuple[typing.Type[Context], ...])),
+            "typing.Tuple[typing.Type[surface._type.Context], ...]",
+        )
+        self.assertEqual(str(TypingType(typing.List)), "typing.List")
+
+    def test_union_sorted(self):
+        self.assertEqual(
+            str(TypingType(typing.Optional[typing.Iterable[str]])),
+            "typing.Union[NoneType, typing.Iterable[str]]",
+        )
+        self.assertEqual(
+            str(
+                TypingType(
+                    typing.Dict[
+                        str, typing.Union[int, typing.List[typing.Optional[str]]]
+                    ]
+                )
+            ),
+            "typing.Dict[str, typing.Union[int, typing.List[typing.Union[NoneType, str]]]]",
+        )
+
+    def test_cached(self):
+        hint = typing.Dict[str, typing.Optional[int]]
+        self.assertIs(TypingType(hint), TypingType(hint))
+
+
+class TestContext(unittest.TestCase):
+    def test_layers(self):
+        module = {"List": "shadowed", "value": 1}
+        context = Context(module)
+        self.assertEqual(context.eval("value"), 1)
+        self.assertEqual(context.eval("List"), "shadowed")
+        self.assertIs(context.eval("Dict"), typing.Dict)
+        self.assertIs(context.eval("len"), len)
+        module["later"] = 2
+        self.assertEqual(context.eval("later"), 2)
+
+    def test_imports(self):
+        module = {}
+        context = Context(module)
+        annotation = AnnotationType("json.JSONDecoder", context)
+        self.assertEqual(annotation.type, "json.decoder.JSONDecoder")
+        self.assertIn("json", context.imports)
+        self.assertEqual(module, {})
+
+    def test_resolved_once(self):
+        context = Context({})
+        found = AnnotationType("Dict[str, int]", context).type
+        missing = AnnotationType("not_a_module.Type", context).type
+        self.assertEqual(found, "typing.Dict[str, int]")
+        self.assertEqual(missing, "~unknown")
+        self.assertIn("not_a_module", context.missing)
+        context.eval = None  # Anything evaluated again would fail
+        self.assertEqual(AnnotationType("Dict[str, int]", context).type, found)
+        self.assertEqual(AnnotationType("not_a_module.Type", context).type, missing)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Postponed annotations need 3.7")
+    def test_postponed(self):
+        module = {"__name__": "postponed"}
+        source = "\n".join(
+            (
+                "from __future__ import annotations",
+                "from typing import List",
+                "def func(a: List[int], b: List[int]) -> List[str]: pass",
+                "def _private(a: NotDefinedAnywhere): pass",
+            )
+        )
+        exec(compile(source, "postponed.py", "exec"), module)
+        self.assertEqual(
+            FuncType(module["func"]).as_var(),
+            "typing.Callable[[typing.List[int], typing.List[int]], typing.List[str]]",
+        )
+        # Only hints asked for are worked out. Each once.
+        context = Context(module)
+        self.assertEqual(
+            context.types,
+            {"List[int]": "typing.List[int]", "List[str]": "typing.List[str]"},
+        )
+
+
 class TestComments(unittest.TestCase):
     def test_function(self):
         import test_comments
@@ -103,6 +222,32 @@ class TestComments(unittest.TestCase):
             FuncType(test_comments.func4).as_var(), "typing.Callable[..., ~unknown]"
         )
 
+    def test_index(self):
+        source = "\n".join(
+            (
+                "def func1(a):  # type: (int) -> str",
+                "    pass",
+                "\f",
+                "@decorator",
+                "def func2(",
+                "    a,  # type: int",
+                "    b,  # type: bool",
+                "):",
+                "    # type: (...) -> None",
+                "    def inner(): # type: () -> int",
+                "        pass",
+                "def func3(a):",
+                "    pass",
+                "",
+            )
+        )
+        index = CommentIndex(source)
+        self.assertEqual(index.get(1, ["a"]), ({"a": "int"}, "str"))
+        self.assertEqual(index.get(4, None), ({"a": "int", "b": "bool"}, "None"))
+        self.assertEqual(index.get(10, []), ({}, "int"))
+        self.assertEqual(index.get(12, ["a"]), None)
+        self.assertEqual(index.get(2, ["a"]), None)
+
 
 class TestDocstring(unittest.TestCase):
     def test_function(self):
@@ -1,9 +1,25 @@
+import sys
 import unittest
 import types
+import threading
+import functools
+import json
 import imp
 import os.path
 
-from surface._utils import clean_repr
+from surface._utils import (
+    Cache,
+    IDCache,
+    Layers,
+    Session,
+    clean_repr,
+    clamp_string,
+    get_size,
+    json_dumps,
+    json_loads,
+    parse_limit,
+    safe_repr,
+)
 
 
 class A(object):
@@ -11,6 +27,160 @@ class A(object):
         raise RuntimeError("Error {}".format(self))
 
 
+class B(object):
+    calls = 0
+
+    def __repr__(self):
+        B.calls += 1
+        return "B!"
+
+
+class Counted(IDCache):
+    inits = 0
+
+    def __init__(self, item):
+        Counted.inits += 1
+        self.item = item
+
+
+class TestIDCache(unittest.TestCase):
+    def test_reuse(self):
+        item = A()
+        with Session():
+            inits = Counted.inits
+            self.assertIs(Counted(item), Counted(item))
+            self.assertEqual(Counted.inits, inits + 1)
+            self.assertIsNot(Counted(A()), Counted(item))
+
+    def test_session(self):
+        item = A()
+        with Session() as session:
+            first = Counted(item)
+            with Session():
+                self.assertIsNot(Counted(item), first)
+            self.assertIs(Counted(item), first)
+            session.clear()
+            self.assertIsNot(Counted(item), first)
+
+
+class TestJson(unittest.TestCase):
+    def test_matches_json(self):
+        value = {"b": [1, 2.5, -3e20, None, True, False, u"\u00e9\n", {}, []], "a": {}}
+        for indent in (None, 2):
+            text = json.dumps(value, indent=indent, sort_keys=True)
+            self.assertEqual(json_dumps(value, indent), text)
+            self.assertEqual(json_loads(text), value)
+
+    def test_deep(self):
+        value = {"leaf": [1, u"two", None]}
+        for _ in range(sys.getrecursionlimit()):
+            value = {"key": [value, 0]}
+        for indent in (None, 2):
+            text = json_dumps(value, indent)
+            self.assertTrue(text.endswith("}"))
+            loaded = json_loads(text)
+            for _ in range(sys.getrecursionlimit()):
+                loaded = loaded["key"][0]
+            self.assertEqual(loaded, {"leaf": [1, u"two", None]})
+
+    def test_invalid(self):
+        depth = sys.getrecursionlimit()
+        for text in ('{"a": 1,}', "1 2", '{"a" 1}', "1" + "]" * depth + " 2"):
+            with self.assertRaises(ValueError):
+                json_loads("[" * depth + text)
+
+
+class TestCache(unittest.TestCase):
+    def test_entries(self):
+        cache = Cache(3)
+        for i in range(3):
+            cache[i] = i
+        cache[0]  # Used recently, so kept
+        cache[3] = 3
+        self.assertEqual(sorted(cache), [0, 2, 3])
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.get(1), None)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+    def test_bytes(self):
+        cache = Cache(None, 1024)
+        for i in range(100):
+            cache[i] = "a" * 100
+        self.assertLessEqual(cache.bytes, 1024)
+        self.assertTrue(0 < len(cache) < 10)
+        self.assertIn(99, cache)
+        cache.clear()
+        self.assertEqual(cache.bytes, 0)
+
+    def test_size(self):
+        shared = ["a" * 1000]
+        nested = {"one": [shared, shared], "two": (shared,)}
+        size = get_size(nested)
+        self.assertGreater(size, 1000)
+        self.assertLess(size, 2000)  # Counted once
+        # Borrowed objects are not counted
+        self.assertLess(get_size(Layers({"big": "a" * 10000})), 1000)
+
+    def test_size_comments(self):
+        from surface._comment import CommentIndex
+
+        source = "def func(a):  # type: (int) -> int\n    return a\n" * 200
+        index = CommentIndex(source)
+        self.assertGreater(get_size(index), len(source) * 2)
+
+    def test_named(self):
+        name = "test_named_cache"
+        Cache(name=name)[1] = 1
+        cache = Cache(name=name)
+        cache.get(1)
+        self.assertIs(cache.stats, Cache.STATS[name])
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.peak, 1)
+
+    def test_session_limits(self):
+        session = Session({None: (5, None), "Counted": (None, 2048)})
+        self.assertEqual(session.get_cache(Session).size, 5)
+        self.assertEqual(session.get_cache(Counted).max_bytes, 2048)
+        self.assertEqual(session.get_cache(Counted).name, "Counted")
+
+    def test_threads(self):
+        cache = Cache(5, 4096)
+        errors = []
+
+        def churn(offset):
+            try:
+                for i in range(3000):
+                    key = (i + offset) % 8
+                    cache[key] = "a" * key
+                    cache.get((key + 1) % 8)
+            except Exception as err:
+                errors.append(err)
+
+        switch = getattr(sys, "setswitchinterval", None)
+        if switch:
+            interval = sys.getswitchinterval()
+            switch(1e-6)  # Swap threads often, to shake out any races
+        try:
+            threads = [threading.Thread(target=churn, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if switch:
+                switch(interval)
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 5)
+        self.assertEqual(cache.bytes, sum(sys.getsizeof(cache[key]) for key in cache))
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit("200"), (200, None))
+        self.assertEqual(parse_limit("2kb"), (None, 2048))
+        self.assertEqual(parse_limit("3MB"), (None, 3 * 1024 ** 2))
+        with self.assertRaises(ValueError):
+            parse_limit("lots")
+
+
 class TestCleanRepr(unittest.TestCase):
     def test_exception_clean(self):
         a1, a2 = A(), A()
@@ -27,5 +197,50 @@ class TestCleanRepr(unittest.TestCase):
         self.assertEqual(clean1, clean2)
 
 
+class TestSafeRepr(unittest.TestCase):
+    def test_small(self):
+        for value in (1, "abc", [1, 2, 3], {"a": (1, 2)}, None):
+            self.assertEqual(safe_repr(value), repr(value))
+
+    def test_medium(self):
+        # Anything short enough to show in full is shown as it always was
+        for value in (
+            list(range(30)),
+            list(range(60)),
+            [[[[1]]]],
+            functools.reduce(lambda value, _: [value], range(40), 1),
+            dict((i, str(i)) for i in range(25)),
+            dict((str(i), i) for i in reversed(range(15))),
+            set(range(40)),
+            frozenset(range(40)),
+            tuple(range(45)),
+            (1,),
+            {"a": [1, (2, 3)], "b": {"c": set([4])}},
+            "a" * 150,
+        ):
+            self.assertEqual(safe_repr(value), clamp_string(clean_repr(repr(value))))
+
+    def test_large(self):
+        value = list(range(100000))
+        text = safe_repr(value)
+        self.assertLessEqual(len(text), 200)
+        self.assertEqual(text[:98], clamp_string(repr(value))[:98])
+        for value in ("a" * 150 + "b" * 100000 + "c" * 150, 10 ** 400, ["d" * 300]):
+            # Clamped the same as before
+            self.assertEqual(safe_repr(value), clamp_string(clean_repr(repr(value))))
+        text = safe_repr("a" * 100000)
+        self.assertLessEqual(len(text), 200)
+        text = safe_repr({i: [[[i]]] for i in range(1000)})
+        self.assertLessEqual(len(text), 200)
+
+    def test_user_repr(self):
+        calls = B.calls
+        self.assertEqual(safe_repr(B()), "B!")
+        self.assertEqual(B.calls, calls + 1)
+        text = safe_repr(B(), user_repr=False)
+        self.assertEqual(B.calls, calls + 1)
+        self.assertIn("B object at memory_address", text)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,8 @@
+# Generated by a code generator. DO NOT EDIT!
+""" Stand in for generated code """
+
+CONST_A = 1
+CONST_B = 2
+CONST_C = 3
+CONST_D = 4
+CONST_E = 5
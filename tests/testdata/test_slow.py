@@ -0,0 +1,17 @@
+""" Lookups that take their time """
+
+if False:
+    from typing import *
+
+import time as _time
+
+
+class SlowDescriptor(object):
+    def __get__(self, instance, owner):  # type: (Any, Any) -> int
+        _time.sleep(0.2)
+        return 1
+
+
+class Holder(object):
+    slow = SlowDescriptor()
+    quick = 1
@@ -0,0 +1,18 @@
+import not_a_real_module
+from not_a_real_package import Thing
+from test_mod_basic import myFunc as alias
+
+
+def func(a, b=None):  # type: (Thing, Base) -> not_a_real_module.Type
+    pass
+
+
+class Base(object):
+    def method(self, a):  # type: (int) -> str
+        pass
+
+
+class Child(Base):
+    @property
+    def prop(self):  # type: () -> Base
+        pass
@@ -0,0 +1,40 @@
+""" Attributes that run code when looked up """
+
+if False:
+    from typing import *
+
+_lookups = []  # type: List[str]
+
+
+class Tracked(object):
+    """ Descriptor, recording every lookup """
+
+    def __get__(self, instance, owner):  # type: (Any, Any) -> int
+        _lookups.append("Tracked")
+        return 1
+
+
+class Meta(type):
+    def __getattribute__(cls, name):
+        if name == "tracked":
+            _lookups.append("Meta")
+        return super(Meta, cls).__getattribute__(name)
+
+
+Base = Meta("Base", (object,), {})
+
+
+class Lazy(Base):
+    tracked = Tracked()
+
+    @property
+    def prop(self):  # type: () -> str
+        return ""
+
+    @classmethod
+    def create(cls, value):  # type: (int) -> Lazy
+        return cls()
+
+    @staticmethod
+    def helper(value):  # type: (str) -> None
+        pass